@@ -0,0 +1,14 @@
+import logging
+import sys
+
+# Report output shared by main.py and the helper entry points. It gets its own
+# stdout handler here, so register_transportation_model() and friends stay
+# visible when called from a notebook or script with no logging configured.
+# Records are written as they are logged, keeping them in order with the library logs.
+report = logging.getLogger("transportation_report")
+if not report.handlers:
+    report.setLevel(logging.INFO)
+    report.propagate = False
+    _report_stream = logging.StreamHandler(sys.stdout)
+    _report_stream.setFormatter(logging.Formatter("%(message)s"))
+    report.addHandler(_report_stream)
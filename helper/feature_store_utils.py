@@ -26,6 +26,14 @@ from helper.snowflake_utils import get_feature_store, get_snowpark_session, is_r
 
 logger = logging.getLogger(__name__)
 
+# Warehouse/customer pairs served by the demo cost matrix
+_ROUTE_PAIRS = (
+    ("Warehouse_A", "Customer_1"),
+    ("Warehouse_A", "Customer_2"),
+    ("Warehouse_B", "Customer_1"),
+    ("Warehouse_B", "Customer_2"),
+)
+
 
 class TransportationFeatureStore:
     """
@@ -107,6 +115,10 @@ class TransportationFeatureStore:
             desc="Transportation route entity (warehouse-customer pair)"
         )
         
+        # Feature view handle and route spine, built lazily on first retrieval
+        self._cost_matrix_fv = None
+        self._entities_df = None
+        
     def setup_feature_views(self):
         """
         Set up feature view for transportation cost matrix tracking.
@@ -124,37 +136,50 @@ class TransportationFeatureStore:
         self._create_cost_matrix_fv()
         
         logger.info("✅ Feature view created successfully")
+        
+        # Finally, materialize the pivoted matrix that SQL inference joins against
+        self._create_pivoted_cost_matrix_dt()
     
     def _create_cost_matrix_fv(self):
         """Create feature view for aggregated cost matrix."""
         
         # SQL for cost matrix calculation (reads directly from transportation_data table)
         cost_matrix_query = """
+        WITH route_costs AS (
+            -- Per-row cost components, computed once and reused by every aggregate
+            SELECT
+                warehouse,
+                customer,
+                last_updated,
+                fuel_price_per_liter,
+                seasonal_factor,
+                priority_multiplier,
+                -- Distance-based costs
+                distance_km * base_rate_per_km * road_condition_factor as distance_cost,
+                -- Fuel costs: distance / (8 * (capacity / 10) / road_condition) * fuel_price, folded
+                distance_km * road_condition_factor * fuel_price_per_liter * 1.25
+                    / vehicle_capacity_tons as fuel_cost,
+                -- Time costs
+                travel_time_hours * 25 * 0.3 as time_cost,
+                -- Capacity factors
+                10 / vehicle_capacity_tons as capacity_factor
+            FROM transportation_data
+        )
         SELECT 
             warehouse,
             customer,
-            -- Distance-based costs
-            AVG(distance_km * base_rate_per_km * road_condition_factor) as avg_distance_cost,
-            
-            -- Fuel costs
-            AVG((distance_km / (8 * (vehicle_capacity_tons / 10) * (1 / road_condition_factor))) 
-                * fuel_price_per_liter) as avg_fuel_cost,
-            
-            -- Time costs  
-            AVG(travel_time_hours * 25 * 0.3) as avg_time_cost,
-            
-            -- Capacity factors
-            AVG(10 / vehicle_capacity_tons) as avg_capacity_factor,
+            AVG(distance_cost) as avg_distance_cost,
+            AVG(fuel_cost) as avg_fuel_cost,
+            AVG(time_cost) as avg_time_cost,
+            AVG(capacity_factor) as avg_capacity_factor,
             
             -- Environmental factors
             AVG(seasonal_factor) as avg_seasonal_factor,
             AVG(priority_multiplier) as avg_priority_factor,
             
             -- Final composite cost
-            AVG((distance_km * base_rate_per_km * road_condition_factor + 
-                 (distance_km / (8 * (vehicle_capacity_tons / 10) * (1 / road_condition_factor))) * fuel_price_per_liter +
-                 travel_time_hours * 25 * 0.3) * 
-                (10 / vehicle_capacity_tons) * seasonal_factor * priority_multiplier) as composite_cost,
+            AVG((distance_cost + fuel_cost + time_cost) *
+                capacity_factor * seasonal_factor * priority_multiplier) as composite_cost,
                 
             -- Statistical measures
             STDDEV(fuel_price_per_liter) as fuel_price_volatility,
@@ -165,8 +190,7 @@ class TransportationFeatureStore:
             -- Timestamp for point-in-time lookups and auditability
             MAX(last_updated) as feature_timestamp
             
-        FROM transportation_data 
-        WHERE last_updated >= DATEADD('day', -30, CURRENT_TIMESTAMP())
+        FROM route_costs
         GROUP BY warehouse, customer
         """
         
@@ -179,10 +203,17 @@ class TransportationFeatureStore:
             # Timestamp column enables point-in-time lookups
             # Remove this line for a timestamp-free feature view (loses historical capabilities)
             timestamp_col="feature_timestamp",
+            # Materialize as a Snowflake-managed dynamic table so retrievals read
+            # the stored aggregate instead of re-running the GROUP BY every call.
+            # Incremental refresh only recomputes routes with changed source rows,
+            # which requires a deterministic query (no CURRENT_TIMESTAMP window).
+            refresh_freq="1 hour",
+            refresh_mode="INCREMENTAL",
             desc="Aggregated cost matrix features with statistical measures"
         )
         
-        self.fs.register_feature_view(
+        # Keep the registered version; it names the dynamic table the pivot reads from
+        self._cost_matrix_fv = self.fs.register_feature_view(
             feature_view=cost_matrix_fv,
             version="1.0",
             overwrite=True
@@ -190,6 +221,66 @@ class TransportationFeatureStore:
         
         logger.info("✅ Created cost_matrix_features feature view")
     
+    def _create_pivoted_cost_matrix_dt(self, target_lag: str = "1 hour"):
+        """
+        Create a dynamic table holding the cost matrix pivoted to one row.
+        
+        SQL inference cross joins this single row instead of re-aggregating the
+        feature view with MAX(CASE ...) on every query. The target lag matches the
+        feature view refresh, since a dynamic table cannot lag less than its source.
+        
+        Args:
+            target_lag: Dynamic table target lag
+        """
+        warehouse = self.session.get_current_warehouse() or os.getenv('SNOWFLAKE_WAREHOUSE')
+        if not warehouse:
+            raise ValueError("A warehouse is required to refresh the pivoted cost matrix. "
+                             "Set SNOWFLAKE_WAREHOUSE or run USE WAREHOUSE in the session.")
+        source_table = self._cost_matrix_feature_view().fully_qualified_name()
+        pivoted_cost_matrix_query = f"""
+        CREATE OR REPLACE DYNAMIC TABLE {self.database}.{self.schema}.PIVOTED_COST_MATRIX
+            TARGET_LAG = '{target_lag}'
+            WAREHOUSE = {warehouse}
+        AS
+        SELECT 
+            MAX(CASE WHEN warehouse = 'Warehouse_A' AND customer = 'Customer_1' THEN composite_cost END) as cost_a_to_1,
+            MAX(CASE WHEN warehouse = 'Warehouse_A' AND customer = 'Customer_2' THEN composite_cost END) as cost_a_to_2,
+            MAX(CASE WHEN warehouse = 'Warehouse_B' AND customer = 'Customer_1' THEN composite_cost END) as cost_b_to_1,
+            MAX(CASE WHEN warehouse = 'Warehouse_B' AND customer = 'Customer_2' THEN composite_cost END) as cost_b_to_2,
+            MAX(feature_timestamp) as feature_timestamp
+        FROM {source_table}
+        """
+        self.session.sql(pivoted_cost_matrix_query).collect()
+        
+        logger.info("✅ Created pivoted_cost_matrix dynamic table")
+    
+    def _spine_df(self):
+        """
+        Entities dataframe for the route combinations we need (built once per instance).
+        _ROUTE_PAIRS is already unique, so each route is looked up exactly once.
+        """
+        if self._entities_df is None:
+            self._entities_df = self.session.create_dataframe(
+                [list(pair) for pair in _ROUTE_PAIRS],
+                schema=["warehouse", "customer"]
+            )
+        return self._entities_df
+    
+    def _cost_matrix_feature_view(self):
+        """The registered cost matrix feature view (metadata lookup only on the first call)."""
+        if self._cost_matrix_fv is None:
+            self._cost_matrix_fv = self.fs.get_feature_view("cost_matrix_features", "1.0")
+        return self._cost_matrix_fv
+    
+    def _retrieve_cost_features(self, feature_timestamp: Optional[datetime] = None) -> pd.DataFrame:
+        """Retrieve the cost matrix feature rows, one per route."""
+        # Retrieve features using the feature store
+        retrieved_features = self.fs.retrieve_feature_values(
+            spine_df=self._spine_df(),
+            features=[self._cost_matrix_feature_view()]
+        )
+        return retrieved_features.to_pandas()
+    
     def get_latest_cost_matrix(self, feature_timestamp: Optional[datetime] = None) -> pd.DataFrame:
         """
         Get the latest cost matrix from feature store.
@@ -201,22 +292,7 @@ class TransportationFeatureStore:
         Returns:
             DataFrame: Cost matrix with warehouses as rows, customers as columns
         """
-        # Create entities dataframe for the route combinations we need
-        entities_df = self.session.create_dataframe([
-            ["Warehouse_A", "Customer_1"],
-            ["Warehouse_A", "Customer_2"],
-            ["Warehouse_B", "Customer_1"],
-            ["Warehouse_B", "Customer_2"]
-        ], schema=["warehouse", "customer"])
-        # Get the feature view
-        cost_matrix_fv = self.fs.get_feature_view("cost_matrix_features", "1.0")
-        # Retrieve features using the feature store
-        retrieved_features = self.fs.retrieve_feature_values(
-            spine_df=entities_df,
-            features=[cost_matrix_fv]
-        )
-        # Convert to pandas and create cost matrix
-        cost_matrix_df = retrieved_features.to_pandas()
+        cost_matrix_df = self._retrieve_cost_features(feature_timestamp)
         
         # Create pivot table for cost matrix format
         cost_matrix = cost_matrix_df.pivot(
@@ -226,6 +302,21 @@ class TransportationFeatureStore:
         )
         
         return cost_matrix
+    
+    def get_latest_route_costs(self, feature_timestamp: Optional[datetime] = None) -> np.ndarray:
+        """
+        Get the latest route costs as a flat array, skipping the pivot.
+        
+        Args:
+            feature_timestamp: Optional timestamp for point-in-time lookup
+                              If None, gets the latest available features
+            
+        Returns:
+            ndarray: Composite cost per route in _ROUTE_PAIRS order (NaN if missing)
+        """
+        cost_matrix_df = self._retrieve_cost_features(feature_timestamp)
+        route_costs = cost_matrix_df.set_index(['WAREHOUSE', 'CUSTOMER'])['COMPOSITE_COST']
+        return route_costs.reindex(pd.MultiIndex.from_tuples(_ROUTE_PAIRS)).to_numpy(dtype=np.float64)
 
 
 def setup_transportation_feature_store(database: str = None, schema: str = None) -> TransportationFeatureStore:
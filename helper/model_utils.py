@@ -1,14 +1,13 @@
 import os
+import re
 import pandas as pd
 import numpy as np
+from helper import report
 from helper.snowflake_utils import get_snowpark_session, get_snowflake_connection
+from helper.register_with_snowflake import MODEL_NAME
 
-def example_model_usage_in_snowflake():
-    """
-    Example of how to use the registered model in Snowflake for batch predictions.
-    This would be run as SQL in Snowflake after registration.
-    """
-    sql_generate_scenarios = """
+# SQL templates for the batch prediction example, built once at import time
+_GENERATE_SCENARIOS_SQL = """
     -- Create a table with optimization scenarios
     CREATE OR REPLACE TABLE transportation_scenarios AS
     SELECT * FROM VALUES
@@ -19,22 +18,11 @@ def example_model_usage_in_snowflake():
     AS t(scenario_name, warehouse_a_capacity, warehouse_b_capacity, 
         customer_1_demand, customer_2_demand, cost_a_to_1, cost_a_to_2, 
         cost_b_to_1, cost_b_to_2);
-    """
-    results = get_snowflake_connection().cursor().execute(sql_generate_scenarios)
-    print(results)
+"""
 
-    sql_batch_optimization = f"""
+_BATCH_OPTIMIZATION_SQL = """
     -- Run batch optimization using the registered model
-    WITH feature_costs AS (
-    SELECT 
-        MAX(CASE WHEN warehouse = 'Warehouse_A' AND customer = 'Customer_1' THEN composite_cost END) as cost_a_to_1,
-        MAX(CASE WHEN warehouse = 'Warehouse_A' AND customer = 'Customer_2' THEN composite_cost END) as cost_a_to_2,
-        MAX(CASE WHEN warehouse = 'Warehouse_B' AND customer = 'Customer_1' THEN composite_cost END) as cost_b_to_1,
-        MAX(CASE WHEN warehouse = 'Warehouse_B' AND customer = 'Customer_2' THEN composite_cost END) as cost_b_to_2,
-        MAX(feature_timestamp) as feature_timestamp
-    FROM "COST_MATRIX_FEATURES$1.0"  -- This is your feature store view
-    ),
-    mv AS MODEL "TRANSPORTATION_OPTIMIZER_FS" VERSION "{os.getenv('MODEL_VERSION')}",
+    WITH mv AS MODEL "{model_name}" VERSION "{model_version}",
     scenarios AS (
     SELECT
         SCENARIO_NAME,
@@ -43,7 +31,8 @@ def example_model_usage_in_snowflake():
         CUSTOMER_1_DEMAND,
         CUSTOMER_2_DEMAND
         FROM TRANSPORTATION_SCENARIOS
-    )
+    ),
+    predictions AS (
     SELECT
         mv ! "PREDICT"(
             s.scenario_name,
@@ -56,8 +45,12 @@ def example_model_usage_in_snowflake():
             f.cost_b_to_1,
             f.cost_b_to_2,
             f.feature_timestamp
-        ) as result,
-        -- Extract values from the JSON object
+        ) as result
+    FROM scenarios s
+    CROSS JOIN pivoted_cost_matrix f  -- One-row pivot of the feature store view
+    )
+    -- Extract values from the JSON object (only scalar columns are returned)
+    SELECT
         result:optimal_cost::FLOAT AS optimal_cost,
         result:shipment_a_to_1::FLOAT AS shipment_a_to_1,
         result:shipment_a_to_2::FLOAT AS shipment_a_to_2,
@@ -66,70 +59,58 @@ def example_model_usage_in_snowflake():
         result:warehouse_a_utilization::FLOAT AS warehouse_a_utilization,
         result:warehouse_b_utilization::FLOAT AS warehouse_b_utilization,
         result:scenario_name::STRING AS result_scenario_name,
-        result:feasible::BOOLEAN AS feasible,
-    FROM scenarios s
-    CROSS JOIN feature_costs f;
+        result:feasible::BOOLEAN AS feasible
+    FROM predictions;
+"""
+
+# Model and version names are identifiers; they cannot be bound as query parameters
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+
+
+def _batch_optimization_sql(model_name: str, model_version: str) -> str:
+    """Render the batch optimization SQL for a validated model name and version."""
+    if not model_version or not _IDENTIFIER_RE.match(model_version):
+        raise ValueError(f"Invalid MODEL_VERSION {model_version!r}: expected a Snowflake identifier such as 'V1_6'")
+    if not _IDENTIFIER_RE.match(model_name):
+        raise ValueError(f"Invalid model name {model_name!r}: expected a Snowflake identifier")
+    return _BATCH_OPTIMIZATION_SQL.format(model_name=model_name, model_version=model_version)
+
+def example_model_usage_in_snowflake(model_name: str = MODEL_NAME, version_name: str = None):
+    """
+    Example of how to use the registered model in Snowflake for batch predictions.
+    This would be run as SQL in Snowflake after registration.
+    
+    Args:
+        model_name: Registered model name
+        version_name: Model version (defaults to the MODEL_VERSION environment variable)
     """
-    print(sql_batch_optimization)
-    results = get_snowpark_session().sql(sql_batch_optimization).to_pandas()
-    print(results)
+    with get_snowflake_connection().cursor() as cursor:
+        report.info(str(cursor.execute(_GENERATE_SCENARIOS_SQL).fetchone()))
+
+    sql_batch_optimization = _batch_optimization_sql(model_name, version_name or os.getenv('MODEL_VERSION'))
+    report.info(sql_batch_optimization)
+    # Stream results batch by batch instead of buffering the whole result client-side
+    for batch in get_snowpark_session().sql(sql_batch_optimization).to_pandas_batches():
+        report.info(batch.to_string())
+
+# Sample scenarios, stored column-wise:
+# base case, high demand, price volatility, capacity constraints, infeasible
+_SAMPLE_SCENARIOS = pd.DataFrame({
+    'scenario_name': ['base_case', 'peak_season', 'fuel_cost_spike', 'reduced_capacity', 'impossible_demand'],
+    'warehouse_a_capacity': [100, 100, 100, 60, 50],
+    'warehouse_b_capacity': [80, 80, 80, 50, 40],
+    'customer_1_demand': [70, 90, 70, 70, 70],
+    'customer_2_demand': [60, 80, 60, 60, 60],
+    'cost_a_to_1': [5, 5, 7, 5, 5],
+    'cost_a_to_2': [8, 8, 10, 8, 8],
+    'cost_b_to_1': [6, 6, 8, 6, 6],
+    'cost_b_to_2': [4, 4, 6, 4, 4]
+})
 
 def create_sample_scenarios_table():
     """
     Create sample scenarios for testing the model.
-    """
-    scenarios = pd.DataFrame([
-        # Base case
-        {
-            'scenario_name': 'base_case',
-            'warehouse_a_capacity': 100,
-            'warehouse_b_capacity': 80,
-            'customer_1_demand': 70,
-            'customer_2_demand': 60,
-            'cost_a_to_1': 5, 'cost_a_to_2': 8,
-            'cost_b_to_1': 6, 'cost_b_to_2': 4
-        },
-        # High demand scenario
-        {
-            'scenario_name': 'peak_season',
-            'warehouse_a_capacity': 100,
-            'warehouse_b_capacity': 80,
-            'customer_1_demand': 90,
-            'customer_2_demand': 80,
-            'cost_a_to_1': 5, 'cost_a_to_2': 8,
-            'cost_b_to_1': 6, 'cost_b_to_2': 4
-        },
-        # Price volatility
-        {
-            'scenario_name': 'fuel_cost_spike',
-            'warehouse_a_capacity': 100,
-            'warehouse_b_capacity': 80,
-            'customer_1_demand': 70,
-            'customer_2_demand': 60,
-            'cost_a_to_1': 7, 'cost_a_to_2': 10,
-            'cost_b_to_1': 8, 'cost_b_to_2': 6
-        },
-        # Capacity constraints
-        {
-            'scenario_name': 'reduced_capacity',
-            'warehouse_a_capacity': 60,
-            'warehouse_b_capacity': 50,
-            'customer_1_demand': 70,
-            'customer_2_demand': 60,
-            'cost_a_to_1': 5, 'cost_a_to_2': 8,
-            'cost_b_to_1': 6, 'cost_b_to_2': 4
-        },
-        # Infeasible scenario  
-        {
-            'scenario_name': 'impossible_demand',
-            'warehouse_a_capacity': 50,
-            'warehouse_b_capacity': 40,
-            'customer_1_demand': 70,
-            'customer_2_demand': 60,
-            'cost_a_to_1': 5, 'cost_a_to_2': 8,
-            'cost_b_to_1': 6, 'cost_b_to_2': 4
-        }
-    ])
     
-    return scenarios
-
+    Returns a fresh copy so callers can add or overwrite columns freely.
+    """
+    return _SAMPLE_SCENARIOS.copy()
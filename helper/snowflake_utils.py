@@ -6,19 +6,139 @@ initializing Feature Store instances, and managing authentication.
 """
 
 import os
+import re
+import sys
+import time
+import atexit
 import logging
-from typing import Optional, Dict, Any
+import threading
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Dict, Any, Literal, TYPE_CHECKING
 import snowflake.connector
 from snowflake.snowpark import Session
-from snowflake.ml.feature_store import FeatureStore, CreationMode
-from snowflake.ml.registry import Registry
-from snowflake.connector import DictCursor
+from snowflake.connector.errors import ProgrammingError
+
+# snowflake.ml is slow to import; it is loaded on first Feature Store/Registry use
+if TYPE_CHECKING:
+    from snowflake.ml.feature_store import FeatureStore
+    from snowflake.ml.registry import Registry
+
+# Only available when Snowpark provides an execution context
+try:
+    from snowflake.snowpark.context import get_active_session as _get_active_session
+except ImportError:
+    _get_active_session = None
+
+# Only needed for key-pair authentication
+try:
+    from cryptography.hazmat.primitives import serialization
+except ImportError:
+    serialization = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _feature_store_api():
+    """Import the Feature Store classes on first use."""
+    from snowflake.ml.feature_store import FeatureStore, CreationMode
+    return FeatureStore, CreationMode
+
+
+@lru_cache(maxsize=1)
+def _registry_class():
+    """Import the Model Registry class on first use."""
+    from snowflake.ml.registry import Registry
+    return Registry
+
+
+@dataclass(frozen=True, slots=True)
+class SnowflakeConfig:
+    """Snowflake connection settings read from environment variables."""
+    
+    user: Optional[str] = None
+    account: Optional[str] = None
+    warehouse: Optional[str] = None
+    database: Optional[str] = None
+    schema: Optional[str] = None
+    role: str = 'MLOPS_ROLE'
+    private_key_path: Optional[str] = None
+    query_tag: str = 'mlops.transportation_optimizer'
+    private_key_passphrase: str = field(default='', repr=False)
+    password: Optional[str] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_env(cls) -> 'SnowflakeConfig':
+        """Build the configuration from SNOWFLAKE_* environment variables."""
+        return cls(
+            user=os.getenv('SNOWFLAKE_USER'),
+            account=os.getenv('SNOWFLAKE_ACCOUNT'),
+            warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
+            database=os.getenv('SNOWFLAKE_DATABASE'),
+            schema=os.getenv('SNOWFLAKE_SCHEMA'),
+            role=os.getenv('SNOWFLAKE_ROLE', 'MLOPS_ROLE'),
+            private_key_path=os.getenv('SNOWFLAKE_PRIVATE_KEY_PATH'),
+            query_tag=os.getenv('SNOWFLAKE_QUERY_TAG', 'mlops.transportation_optimizer'),
+            private_key_passphrase=os.getenv('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE', ''),
+            password=os.getenv('SNOWFLAKE_PASSWORD'),
+        )
+
+
+@lru_cache(maxsize=4)
+def _load_private_key(path: str, mtime: float, passphrase: str):
+    """
+    Read and deserialize a PEM private key.
+    
+    Cached on (path, mtime, passphrase): the file is parsed once, and again only
+    if it is modified.
+    """
+    if serialization is None:
+        raise ImportError("Key-pair authentication requires the 'cryptography' package")
+    # A PEM key is a few KB: read it with a single unbuffered syscall
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        key_data = os.read(fd, max(os.fstat(fd).st_size, 1))
+    finally:
+        os.close(fd)
+    return serialization.load_pem_private_key(
+        key_data,
+        password=passphrase.encode() or None,
+    )
+
+
+# Statements whose results are worth fetching; anything else only returns a status row
+_ROW_RETURNING_KEYWORDS = frozenset({'SELECT', 'WITH', 'SHOW', 'DESC', 'DESCRIBE', 'LIST', 'LS', 'CALL', 'EXPLAIN', 'VALUES', 'TABLE'})
+# Metadata statements are answered in JSON rather than Arrow, so they are fetched as dicts
+_METADATA_KEYWORDS = frozenset({'SHOW', 'DESC', 'DESCRIBE', 'LIST', 'LS'})
+_LEADING_COMMENTS_RE = re.compile(r'^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*', re.DOTALL)
+
+
+def _statement_keyword(query: str) -> str:
+    """Return the upper-cased leading keyword of a statement, skipping comments."""
+    body = query[_LEADING_COMMENTS_RE.match(query).end():].lstrip('(')
+    return body.split(None, 1)[0].upper() if body else ''
+
+
+def _returns_rows(query: str) -> bool:
+    """Check whether a statement returns a result set, based on its leading keyword."""
+    return _statement_keyword(query) in _ROW_RETURNING_KEYWORDS
+
+
+# "Object does not exist or not authorized" - what SHOW ... IN MODEL raises for a missing model
+_OBJECT_DOES_NOT_EXIST_ERRNO = 2003
+
+# Environment variables that indicate code is running inside Snowflake
+_SNOWFLAKE_ENV_INDICATORS = (
+    'SNOWFLAKE_WAREHOUSE_ID',
+    'SNOWFLAKE_CLUSTER_ID',
+    'SNOWFLAKE_SESSION_ID',
+    'SNOWFLAKE_QUERY_ID',
+    'SNOWFLAKE_ACCOUNT_LOCATOR'
+)
+
+
 class SnowflakeManager:
     """
     Manages Snowflake connections and ML services (Feature Store, Model Registry).
@@ -29,24 +149,35 @@ class SnowflakeManager:
     """
     
     def __init__(self):
+        self._config = None
+        self._auth_cache = None
+        self._conn_params = None
         self._connection = None
         self._session = None
-        self._feature_store = None
-        self._model_registry = None    
+        self._session_inherited = False
+        self._current_ns = None  # (database, schema) of the session, fetched on demand
+        self._feature_stores = {}
+        self._model_registries = {}
+        self._init_lock = threading.RLock()
+        # (model_name, version_name) -> (expires_at, exists)
+        self._version_exists_cache = {}
+        self._version_exists_ttl = 60
+        
+        _live_managers.add(self)
     
     def get_connection(self) -> snowflake.connector.SnowflakeConnection:
         """
-        Establish and return a Snowflake connection.
+        Return the Snowflake connection underlying the Snowpark Session.
         
-        Uses Container Session Inheritance when running in Snowflake containers,
-        otherwise creates new connection with explicit authentication.
+        The connector connection is derived from the (inherited or newly created)
+        Snowpark Session, so a run authenticates once instead of opening a second
+        network connection for raw SQL.
         
         Returns:
             snowflake.connector.SnowflakeConnection: Active Snowflake connection
         """
         if self._connection is None:
-            # Local mode - explicit authentication required
-            self._connection = self._create_explicit_connection()
+            self._connection = self.get_session().connection
         
         return self._connection
     
@@ -61,132 +192,137 @@ class SnowflakeManager:
         Returns:
             Session: Active Snowpark Session
         """
-        if self._session is None:
-            # First try to get active session (when running in Snowflake)
-            try:
-                from snowflake.snowpark.context import get_active_session
-                self._session = get_active_session()
-                logger.info("✅ Using active Snowflake session context")
-                return self._session
-            except ImportError:
-                logger.info("🔧 Snowpark context not available, creating new session")
-            except Exception as e:
-                logger.info(f"🔧 No active session found ({type(e).__name__}: {e})")
-                
-                # Check if we're in a Snowflake execution environment
-                # If so, we should not try to create a new session with credentials
+        session = self._session
+        if session is not None:
+            return session
+        
+        # Double-checked under the lock so concurrent callers create only one session
+        with self._init_lock:
+            if self._session is None:
+                # First try to get active session (when running in Snowflake)
                 try:
-                    # Additional check for Snowflake environment indicators
-                    import os
-                    if any(key.startswith('SNOWFLAKE_') for key in os.environ if 'WAREHOUSE' in key or 'CLUSTER' in key):
-                        raise RuntimeError("Running in Snowflake environment but cannot access active session. "
-                                         "This might indicate a session context issue.")
-                except:
-                    pass
+                    if _get_active_session is None:
+                        raise ImportError("snowflake.snowpark.context is not available")
+                    self._session = _get_active_session()
+                    self._session_inherited = True
+                    logger.info("✅ Using active Snowflake session context")
+                    return self._session
+                except ImportError:
+                    logger.info("🔧 Snowpark context not available, creating new session")
+                except Exception as e:
+                    logger.info("🔧 No active session found (%s: %s)", type(e).__name__, e)
+                
+                    # In a Snowflake execution environment a missing session usually means a
+                    # context issue; creating one with credentials is still attempted below
+                    if any(os.environ.get(key) for key in _SNOWFLAKE_ENV_INDICATORS):
+                        logger.warning("Running in Snowflake environment but cannot access active session. "
+                                       "This might indicate a session context issue.")
                 
-            # Only create new session if we're running locally
-            logger.info("🔧 Creating new Snowpark session for local execution")
-            try:
-                self._session = self._create_snowpark_session()
-            except ValueError as e:
-                if "No authentication method available" in str(e):
-                    raise RuntimeError("Cannot create session: No authentication available. "
-                                     "When running in Snowflake, ensure session context is available. "
-                                     "When running locally, provide SNOWFLAKE_PASSWORD or SNOWFLAKE_PRIVATE_KEY_PATH.") from e
-                raise
+                # Only create new session if we're running locally
+                logger.info("🔧 Creating new Snowpark session for local execution")
+                try:
+                    self._session = self._create_snowpark_session()
+                except ValueError as e:
+                    if "No authentication method available" in str(e):
+                        raise RuntimeError("Cannot create session: No authentication available. "
+                                         "When running in Snowflake, ensure session context is available. "
+                                         "When running locally, provide SNOWFLAKE_PASSWORD or SNOWFLAKE_PRIVATE_KEY_PATH.") from e
+                    raise
+            
+            return self._session
+    
+    def get_config(self) -> SnowflakeConfig:
+        """
+        Return the connection configuration, read from the environment on first use.
         
-        return self._session
+        Loaded lazily rather than at import so a .env file loaded by the caller
+        after importing this module is still picked up.
+        """
+        if self._config is None:
+            self._config = SnowflakeConfig.from_env()
+        return self._config
     
-    def _create_snowpark_session(self) -> Session:
+    def _auth_kwargs(self) -> Dict[str, Any]:
         """
-        Create a new Snowpark Session for ML services.
+        Resolve credentials once and share them across Session and connector builds.
         
         Returns:
-            Session: New Snowpark Session
+            Dict with either 'private_key' (key-pair auth) or 'password'
         """
-        try:
-            connection_params = {
-                'user': os.getenv('SNOWFLAKE_USER'),
-                'account': os.getenv('SNOWFLAKE_ACCOUNT'),
-                'warehouse': os.getenv('SNOWFLAKE_WAREHOUSE'),
-                'database': os.getenv('SNOWFLAKE_DATABASE'),
-                'schema': os.getenv('SNOWFLAKE_SCHEMA'),
-                'role': os.getenv('SNOWFLAKE_ROLE', 'MLOPS_ROLE')
-            }
-            
-            # Check for key-pair authentication first (best practice)
-            private_key_path = os.getenv('SNOWFLAKE_PRIVATE_KEY_PATH')
-            if private_key_path and os.path.exists(private_key_path):
-                from cryptography.hazmat.primitives import serialization
-                with open(private_key_path, 'rb') as key_file:
-                    private_key = serialization.load_pem_private_key(
-                        key_file.read(),
-                        password=os.getenv('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE', '').encode() or None,
-                    )
-                connection_params['private_key'] = private_key
-                logger.info("🔐 Using key-pair authentication for Snowpark Session")
-            else:
-                # Fall back to password authentication
-                password = os.getenv('SNOWFLAKE_PASSWORD')
-                if not password:
-                    raise ValueError("No authentication method available. Please provide either SNOWFLAKE_PASSWORD or SNOWFLAKE_PRIVATE_KEY_PATH")
-                connection_params['password'] = password
-                logger.info("🔐 Using password authentication for Snowpark Session")
-            
-            session = Session.builder.configs(connection_params).create()
-            logger.info(f"✅ Created Snowpark Session: {connection_params['account']}")
-            return session
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to create Snowpark Session: {str(e)}")
-            raise
+        if self._auth_cache is None:
+            with self._init_lock:
+                if self._auth_cache is None:
+                    config = self.get_config()
+                    # Check for key-pair authentication first (best practice)
+                    if config.private_key_path and os.path.exists(config.private_key_path):
+                        self._auth_cache = {
+                            'private_key': _load_private_key(config.private_key_path,
+                                                             os.path.getmtime(config.private_key_path),
+                                                             config.private_key_passphrase)
+                        }
+                        logger.info("🔐 Using key-pair authentication")
+                    else:
+                        # Fall back to password authentication
+                        if not config.password:
+                            raise ValueError("No authentication method available. Please provide either SNOWFLAKE_PASSWORD or SNOWFLAKE_PRIVATE_KEY_PATH")
+                        self._auth_cache = {'password': config.password}
+                        logger.info("🔐 Using password authentication")
+        
+        return self._auth_cache
     
-    def _create_explicit_connection(self) -> snowflake.connector.SnowflakeConnection:
+    def _build_connection_params(self) -> Dict[str, Any]:
         """
-        Create a new Snowflake connection with explicit authentication.
+        Build connection parameters from the cached configuration.
+        
+        Computed once and reused whenever the Snowpark Session is (re)created; each
+        caller gets its own copy, including session_parameters.
         
         Returns:
-            snowflake.connector.SnowflakeConnection: New authenticated connection
+            Dict of connection parameters including credentials
+        """
+        if self._conn_params is None:
+            self._conn_params = self._resolve_connection_params()
+        params = self._conn_params
+        return {**params, 'session_parameters': dict(params['session_parameters'])}
+    
+    def _resolve_connection_params(self) -> Dict[str, Any]:
+        """Assemble connection parameters from the configuration and credentials."""
+        config = self.get_config()
+        return {
+            'user': config.user,
+            'account': config.account,
+            'warehouse': config.warehouse,
+            'database': config.database,
+            'schema': config.schema,
+            'role': config.role,
+            # Keep long-lived notebook/CLI sessions authenticated and fail fast on network stalls
+            'client_session_keep_alive': True,
+            'login_timeout': 20,
+            'network_timeout': 60,
+            # Tag queries so they can be traced in QUERY_HISTORY
+            'session_parameters': {'QUERY_TAG': config.query_tag},
+            **self._auth_kwargs()
+        }
+    
+    def _create_snowpark_session(self) -> Session:
+        """
+        Create a new Snowpark Session for ML services.
+        
+        Returns:
+            Session: New Snowpark Session
         """
         try:
-            connection_params = {
-                'user': os.getenv('SNOWFLAKE_USER'),
-                'account': os.getenv('SNOWFLAKE_ACCOUNT'),
-                'warehouse': os.getenv('SNOWFLAKE_WAREHOUSE'),
-                'database': os.getenv('SNOWFLAKE_DATABASE'),
-                'schema': os.getenv('SNOWFLAKE_SCHEMA'),
-                'role': os.getenv('SNOWFLAKE_ROLE', 'MLOPS_ROLE')
-            }
-            
-            # Check for key-pair authentication first (best practice)
-            private_key_path = os.getenv('SNOWFLAKE_PRIVATE_KEY_PATH')
-            if private_key_path and os.path.exists(private_key_path):
-                from cryptography.hazmat.primitives import serialization
-                with open(private_key_path, 'rb') as key_file:
-                    private_key = serialization.load_pem_private_key(
-                        key_file.read(),
-                        password=os.getenv('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE', '').encode() or None,
-                    )
-                connection_params['private_key'] = private_key
-                logger.info("🔐 Using key-pair authentication")
-            else:
-                # Fall back to password authentication
-                password = os.getenv('SNOWFLAKE_PASSWORD')
-                if not password:
-                    raise ValueError("No authentication method available. Please provide either SNOWFLAKE_PASSWORD or SNOWFLAKE_PRIVATE_KEY_PATH")
-                connection_params['password'] = password
-                logger.info("🔐 Using password authentication")
-            
-            connection = snowflake.connector.connect(**connection_params)
-            logger.info(f"✅ Connected to Snowflake: {connection_params['account']}")
-            return connection
+            connection_params = self._build_connection_params()
+            session = Session.builder.configs(connection_params).create()
+            logger.info("✅ Created Snowpark Session: %s", connection_params['account'])
+            return session
             
         except Exception as e:
-            logger.error(f"❌ Failed to connect to Snowflake: {str(e)}")
+            logger.error("❌ Failed to create Snowpark Session: %s", e)
             raise
     
     def get_feature_store(self, database: Optional[str] = None, 
-                         schema: Optional[str] = None) -> FeatureStore:
+                         schema: Optional[str] = None) -> 'FeatureStore':
         """
         Initialize and return a Feature Store instance.
         
@@ -195,197 +331,356 @@ class SnowflakeManager:
             schema: Optional schema name (uses current/env if not provided)
             
         Returns:
-            FeatureStore: Initialized Feature Store instance
+            FeatureStore: Initialized Feature Store instance (cached per database/schema)
         """
-        if self._feature_store is None:
-            # Use Snowpark Session for ML services
-            session = self.get_session()
-            
-            # Determine database and schema
-            fs_database = database
-            fs_schema = schema
-            
-            if fs_database is None or fs_schema is None:
-                # Try to get from session context first
-                try:
-                    if fs_database is None:
-                        fs_database = session.get_current_database()
-                    if fs_schema is None:
-                        fs_schema = session.get_current_schema()
-                    logger.info(f"🔧 Retrieved from session context: {fs_database}.{fs_schema}")
-                except Exception as e:
-                    logger.info(f"🔧 Could not get from session context ({type(e).__name__}), using environment variables")
-                    # Fall back to environment variables
-                    if fs_database is None:
-                        fs_database = os.getenv('SNOWFLAKE_DATABASE')
-                    if fs_schema is None:
-                        fs_schema = os.getenv('SNOWFLAKE_SCHEMA')
-                    logger.info(f"🔧 Retrieved from environment: {fs_database}.{fs_schema}")
-            
-            if not fs_database or not fs_schema:
-                raise ValueError(f"Database and schema must be specified. Got database='{fs_database}', schema='{fs_schema}'")
+        cache_key = (database, schema)
+        cached = self._feature_stores.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Double-checked under the lock so concurrent callers construct it only once
+        with self._init_lock:
+            if cache_key not in self._feature_stores:
+                # Use Snowpark Session for ML services
+                session = self.get_session()
+                
+                # Determine database and schema
+                fs_database = database
+                fs_schema = schema
+                
+                if fs_database is None or fs_schema is None:
+                    # Try to get from session context first
+                    try:
+                        current_database, current_schema = self._current_namespace()
+                        if fs_database is None:
+                            fs_database = current_database
+                        if fs_schema is None:
+                            fs_schema = current_schema
+                        logger.info("🔧 Retrieved from session context: %s.%s", fs_database, fs_schema)
+                    except Exception as e:
+                        logger.info("🔧 Could not get from session context (%s), using environment variables", type(e).__name__)
+                        # Fall back to environment variables
+                        config = self.get_config()
+                        if fs_database is None:
+                            fs_database = config.database
+                        if fs_schema is None:
+                            fs_schema = config.schema
+                        logger.info("🔧 Retrieved from environment: %s.%s", fs_database, fs_schema)
+                
+                if not fs_database or not fs_schema:
+                    raise ValueError(f"Database and schema must be specified. Got database='{fs_database}', schema='{fs_schema}'")
                 
-            logger.info(f"🔧 Creating Feature Store in: {fs_database}.{fs_schema}")
-            self._feature_store = FeatureStore(
-                session=session,
-                database=fs_database,
-                name=fs_schema,
-                default_warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
-                creation_mode=CreationMode.CREATE_IF_NOT_EXIST
-            )
-            logger.info(f"✅ Initialized Feature Store: {fs_database}.{fs_schema}")
+                logger.info("🔧 Creating Feature Store in: %s.%s", fs_database, fs_schema)
+                FeatureStore, CreationMode = _feature_store_api()
+                self._feature_stores[cache_key] = FeatureStore(
+                    session=session,
+                    database=fs_database,
+                    name=fs_schema,
+                    default_warehouse=self.get_config().warehouse,
+                    creation_mode=CreationMode.CREATE_IF_NOT_EXIST
+                )
+                logger.info("✅ Initialized Feature Store: %s.%s", fs_database, fs_schema)
+            
+            return self._feature_stores[cache_key]
+    
+    def _current_namespace(self) -> tuple:
+        """
+        Return the session's current (database, schema), queried once per session.
         
-        return self._feature_store
+        Both values come from a single round-trip instead of separate
+        get_current_database()/get_current_schema() calls.
+        """
+        namespace = self._current_ns
+        if namespace is None:
+            row = self.get_session().sql("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA()").collect()[0]
+            namespace = self._current_ns = (row[0], row[1])
+        return namespace
     
     def get_model_registry(self, database: Optional[str] = None, 
-                          schema: Optional[str] = None) -> Registry:
+                          schema: Optional[str] = None) -> 'Registry':
         """
         Initialize and return a Model Registry instance.
         
         Args:
-            database: Optional database name (uses env var if not provided)
-            schema: Optional schema name (uses env var if not provided)
+            database: Optional database name (uses env var, then session context, if not provided)
+            schema: Optional schema name (uses env var, then session context, if not provided)
             
         Returns:
-            Registry: Initialized Model Registry instance
+            Registry: Initialized Model Registry instance (cached per database/schema)
         """
-        if self._model_registry is None:
-            # Use Snowpark Session for ML services
-            session = self.get_session()
-            reg_database = database or os.getenv('SNOWFLAKE_DATABASE')
-            reg_schema = schema or os.getenv('SNOWFLAKE_SCHEMA')
-            logger.info(f"✅ Initializing Model Registry: {reg_database}.{reg_schema}")
-            self._model_registry = Registry(
-                session=session,
-                database_name=reg_database,
-                schema_name=reg_schema
-            )
-            logger.info(f"✅ Initialized Model Registry: {reg_database}.{reg_schema}")
+        cache_key = (database, schema)
+        cached = self._model_registries.get(cache_key)
+        if cached is not None:
+            return cached
         
-        return self._model_registry
+        # Double-checked under the lock so concurrent callers construct it only once
+        with self._init_lock:
+            if cache_key not in self._model_registries:
+                # Use Snowpark Session for ML services
+                session = self.get_session()
+                config = self.get_config()
+                reg_database = database or config.database
+                reg_schema = schema or config.schema
+                if not reg_database or not reg_schema:
+                    # Fall back to the session context (shared with get_feature_store)
+                    current_database, current_schema = self._current_namespace()
+                    reg_database = reg_database or current_database
+                    reg_schema = reg_schema or current_schema
+                logger.info("✅ Initializing Model Registry: %s.%s", reg_database, reg_schema)
+                Registry = _registry_class()
+                self._model_registries[cache_key] = Registry(
+                    session=session,
+                    database_name=reg_database,
+                    schema_name=reg_schema
+                )
+                logger.info("✅ Initialized Model Registry: %s.%s", reg_database, reg_schema)
+            
+            return self._model_registries[cache_key]
     
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                      result_format: Literal["dict", "arrow", "pandas"] = "dict") -> Dict[str, Any]:
         """
         Execute a SQL query and return results.
         
         Args:
             query: SQL query to execute
             params: Optional query parameters
+            result_format: "dict" (default) for a list of row dicts; "arrow" for a
+                pyarrow Table or "pandas" for a DataFrame, both fetched as Arrow
+                batches without building a Python object per cell (SHOW/DESCRIBE/LIST
+                results are not available as Arrow and always come back as dicts)
             
         Returns:
-            Dict containing query results
+            Dict containing query results ('data' is empty for DDL/DML, with
+            'row_count' holding the affected row count)
         """
-        connection = self.get_connection()
-        cursor = connection.cursor(DictCursor)
-        
+        return self._execute_on(self.get_connection(), query, params, result_format)
+    
+    def _execute_on(self, connection, query: str, params: Optional[Dict[str, Any]],
+                    result_format: str) -> Dict[str, Any]:
+        """Run ``query`` on ``connection`` and package the results for execute_query."""
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            cursor, result_format = self._open_cursor(connection, query, params, result_format)
             
-            results = cursor.fetchall()
-            logger.info(f"Query executed successfully, returned {len(results)} rows")
+            with cursor:
+                if not _returns_rows(query):
+                    # DDL/DML: report affected rows without materializing the status row
+                    results = []
+                    row_count = cursor.rowcount
+                elif result_format == "arrow":
+                    results = cursor.fetch_arrow_all(force_return_table=True)
+                    row_count = results.num_rows
+                elif result_format == "pandas":
+                    results = cursor.fetch_pandas_all()
+                    row_count = len(results)
+                else:
+                    columns = self._column_names(cursor)
+                    results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                    row_count = len(results)
+            logger.debug("Query executed successfully, returned %s rows", row_count)
             return {
                 'success': True,
                 'data': results,
-                'row_count': len(results)
+                'row_count': row_count
             }
             
         except Exception as e:
-            logger.error(f"Query execution failed: {str(e)}")
+            logger.error("Query execution failed: %s", e)
             return {
                 'success': False,
                 'error': str(e),
                 'data': None
             }
-        finally:
+    
+    @staticmethod
+    def _column_names(cursor) -> list:
+        """Result column names, read once so row dicts can be built with zip."""
+        return [column[0] for column in cursor.description]
+    
+    @staticmethod
+    def _open_cursor(connection, query: str, params: Optional[Dict[str, Any]], result_format: str):
+        """
+        Open a cursor suited to ``result_format`` and execute ``query`` on it.
+        
+        Returns:
+            Tuple of (cursor, effective result format); metadata statements are
+            always fetched as dicts since their results are not available as Arrow
+        """
+        if _statement_keyword(query) in _METADATA_KEYWORDS:
+            result_format = "dict"
+        # Plain tuple cursor for every format; dict rows are zipped with the column names
+        cursor = connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+        except Exception:
             cursor.close()
+            raise
+        return cursor, result_format
     
-    def close_connection(self):
-        """Close the Snowflake connection and session."""
-        if self._session:
-            self._session.close()
-            self._session = None
-            logger.info("Snowpark session closed")
+    def model_version_exists(self, model_name: str, version_name: str) -> bool:
+        """
+        Check whether a model version is already registered.
+        
+        Issues a single SHOW VERSIONS metadata query; answers are cached for a
+        short TTL so repeated checks within a run are free. Only completed lookups
+        are cached: a missing model reports False without being remembered, and
+        any other failure (permissions, connection) is raised.
+        
+        Args:
+            model_name: Registered model name
+            version_name: Version name to look for
             
-        if self._connection:
-            self._connection.close()
+        Returns:
+            bool: True if the version exists, False otherwise (including a missing model)
+        """
+        cache_key = (model_name.upper(), version_name.upper())
+        cached = self._version_exists_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        query = f'SHOW VERSIONS IN MODEL "{cache_key[0]}"'
+        try:
+            cursor, _ = self._open_cursor(self.get_connection(), query, None, "dict")
+        except ProgrammingError as e:
+            if e.errno == _OBJECT_DOES_NOT_EXIST_ERRNO:
+                return False
+            raise
+        with cursor:
+            name_index = self._column_names(cursor).index('name')
+            exists = any(str(row[name_index]).upper() == cache_key[1] for row in cursor.fetchall())
+        self._version_exists_cache[cache_key] = (time.monotonic() + self._version_exists_ttl, exists)
+        return exists
+    
+    def close_connection(self):
+        """
+        Close the Snowpark session and the connections this manager owns.
+        
+        Safe to call repeatedly and from several threads; it also runs at
+        interpreter exit for every manager still alive.
+        """
+        with self._init_lock:
+            if self._session:
+                # An inherited session belongs to the Snowflake runtime; only drop our reference
+                if not self._session_inherited:
+                    self._session.close()
+                    logger.info("Snowpark session closed")
+                self._session = None
+        
+            # The connector connection belongs to the session and is closed with it
             self._connection = None
-            logger.info("Snowflake connection closed")
-            
-        self._feature_store = None
-        self._model_registry = None
+            self._session_inherited = False
+        
+
+            self._current_ns = None
+            self._feature_stores = {}
+            self._model_registries = {}
+            self._version_exists_cache = {}
+            # Re-read the environment and credentials on the next connection
+            self._config = None
+            self._auth_cache = None
+            self._conn_params = None
+    
+    def __enter__(self) -> 'SnowflakeManager':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close_connection()
 
 
-# Global instance for easy access
-snowflake_manager = SnowflakeManager()
+# Managers still alive, closed at interpreter exit (weak, so discarded managers can be collected)
+_live_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_managers():
+    """Close sessions left open when the process exits."""
+    for manager in list(_live_managers):
+        try:
+            manager.close_connection()
+        except Exception as e:
+            logger.warning("Failed to close Snowflake manager at exit: %s", e)
 
 
+# Global instance for easy access, created on first use (see __getattr__)
+_default_manager: Optional[SnowflakeManager] = None
+_default_manager_lock = threading.Lock()
+
+
+def _get_default_manager() -> SnowflakeManager:
+    """Return the process-wide manager, creating it on first call."""
+    global _default_manager
+    if _default_manager is None:
+        with _default_manager_lock:
+            if _default_manager is None:
+                _default_manager = SnowflakeManager()
+    return _default_manager
+
+
+def __getattr__(name: str):
+    # Keeps ``from helper.snowflake_utils import snowflake_manager`` working without
+    # building the manager at import time
+    if name == "snowflake_manager":
+        return _get_default_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=1)
 def is_running_in_snowflake() -> bool:
     """
     Detect if code is running within Snowflake execution environment.
     
-    Uses multiple detection methods:
-    1. Active session availability
-    2. Environment variables that indicate Snowflake context
+    Uses multiple detection methods, cheapest first:
+    1. Environment variables that indicate Snowflake context
+    2. Active session availability
     3. Python execution context indicators
     
+    The answer does not change during a process, so it is computed once.
+    
     Returns:
         bool: True if running in Snowflake, False if running locally
     """
-    # Method 1: Try to get active session
-    try:
-        from snowflake.snowpark.context import get_active_session
-        get_active_session()
+    # Method 1: Check for Snowflake-specific environment variables
+    if any(os.environ.get(key) for key in _SNOWFLAKE_ENV_INDICATORS):
         return True
-    except ImportError:
-        pass
-    except:
-        pass
-    
-    # Method 2: Check for Snowflake-specific environment variables
-    import os
-    snowflake_env_indicators = [
-        'SNOWFLAKE_WAREHOUSE_ID',
-        'SNOWFLAKE_CLUSTER_ID', 
-        'SNOWFLAKE_SESSION_ID',
-        'SNOWFLAKE_QUERY_ID',
-        'SNOWFLAKE_ACCOUNT_LOCATOR'
-    ]
     
-    if any(os.getenv(key) for key in snowflake_env_indicators):
-        return True
-        
-    # Method 3: Check execution context (UDF, stored procedure, etc.)
-    try:
-        import sys
-        # In Snowflake UDFs, the module path often contains snowflake-specific paths
-        if any('snowflake' in str(path).lower() for path in sys.path):
+    # Method 2: Try to get active session (raises locally, so only probed without indicators)
+    if _get_active_session is not None:
+        try:
+            _get_active_session()
             return True
-    except:
-        pass
+        except Exception:
+            pass
         
-    return False
+    # Method 3: Check execution context (UDF, stored procedure, etc.)
+    # In Snowflake UDFs, the module path often contains snowflake-specific paths
+    return any('snowflake' in str(path).lower() for path in sys.path)
 
 
 def get_snowflake_connection() -> snowflake.connector.SnowflakeConnection:
     """Get the global Snowflake connection."""
-    return snowflake_manager.get_connection()
+    return _get_default_manager().get_connection()
 
 
 def get_snowpark_session() -> Session:
     """Get the global Snowpark Session."""
-    return snowflake_manager.get_session()
+    return _get_default_manager().get_session()
 
 
 def get_feature_store(database: Optional[str] = None, 
-                     schema: Optional[str] = None) -> FeatureStore:
+                     schema: Optional[str] = None) -> 'FeatureStore':
     """Get the global Feature Store instance."""
-    return snowflake_manager.get_feature_store(database, schema)
+    return _get_default_manager().get_feature_store(database, schema)
 
 
 def get_model_registry(database: Optional[str] = None, 
-                      schema: Optional[str] = None) -> Registry:
+                      schema: Optional[str] = None) -> 'Registry':
     """Get the global Model Registry instance."""
-    return snowflake_manager.get_model_registry(database, schema) 
\ No newline at end of file
+    return _get_default_manager().get_model_registry(database, schema)
+
+
+def model_version_exists(model_name: str, version_name: str) -> bool:
+    """Check whether a model version is already registered."""
+    return _get_default_manager().model_version_exists(model_name, version_name) 
\ No newline at end of file
@@ -7,18 +7,226 @@ Snowflake's model registry using the custom model framework.
 Enhanced with Feature Store integration for dynamic cost matrix retrieval.
 """
 
+import copy
 import pickle
+import numpy as np
 import pandas as pd
-import json
-import tempfile
-import os
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any
 from datetime import datetime
 from snowflake.ml.model import custom_model
 
+from models.transportation_lp import TransportationLP, _read_config
+
 logger = logging.getLogger(__name__)
 
+# (database, schema, feature_timestamp) -> (expires_at, route costs) from the feature store,
+# least recently used first; guarded by _COST_MATRIX_LOCK (predict may run on several threads)
+_COST_MATRIX_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_COST_MATRIX_LOCK = threading.Lock()
+# The feature view refreshes hourly; a few minutes of staleness is acceptable
+_COST_MATRIX_TTL = 300
+# Point-in-time lookups add one entry per distinct timestamp; keep the most recently used few
+_COST_MATRIX_CACHE_SIZE = 32
+
+# Cost input columns and the (warehouse, customer) route each one prices
+_COST_COLUMNS = ('cost_a_to_1', 'cost_a_to_2', 'cost_b_to_1', 'cost_b_to_2')
+_COST_ROUTES = (
+    ('Warehouse_A', 'Customer_1'),
+    ('Warehouse_A', 'Customer_2'),
+    ('Warehouse_B', 'Customer_1'),
+    ('Warehouse_B', 'Customer_2'),
+)
+# Costs assumed for routes without an override when the feature store is not used
+_OVERRIDE_ONLY_DEFAULT_COSTS = (10, 12, 15, 8)
+
+
+def _solve_transportation_2x2(cap_a, cap_b, demand_1, demand_2,
+                              cost_a_to_1, cost_a_to_2, cost_b_to_1, cost_b_to_2):
+    """
+    Solve many 2x2 transportation LPs at once in closed form.
+    
+    Valid for finite, non-negative costs, positive capacities and non-negative
+    demands. Demands then bind at the optimum, so a scenario reduces to choosing
+    the Warehouse A shipments x1 (to Customer 1) and x2 (to Customer 2) in
+    [0, demand_1] x [0, demand_2]; Warehouse B ships the rest. Each customer is
+    served from A where A is cheaper, then the A total is moved into the range
+    both capacities allow along the route where moving costs least.
+    
+    Returns:
+        Tuple of arrays (feasible, ship_a1, ship_a2, ship_b1, ship_b2, optimal_cost)
+    """
+    total_demand = demand_1 + demand_2
+    # Warehouse A must cover whatever Warehouse B cannot, and cannot exceed its own capacity
+    lower = np.maximum(total_demand - cap_b, 0.0)
+    upper = np.minimum(cap_a, total_demand)
+    feasible = lower <= upper
+    
+    # Saving per unit of serving each customer from A instead of B (negative = A is cheaper)
+    delta_1 = cost_a_to_1 - cost_b_to_1
+    delta_2 = cost_a_to_2 - cost_b_to_2
+    ship_a1 = np.where(delta_1 < 0, demand_1, 0.0)
+    ship_a2 = np.where(delta_2 < 0, demand_2, 0.0)
+    
+    # Over Warehouse A capacity: move units back to B where A saves least first
+    excess = np.maximum(ship_a1 + ship_a2 - upper, 0.0)
+    route_1_first = delta_1 >= delta_2
+    first = np.minimum(excess, np.where(route_1_first, ship_a1, ship_a2))
+    ship_a1 = ship_a1 - np.where(route_1_first, first, excess - first)
+    ship_a2 = ship_a2 - np.where(route_1_first, excess - first, first)
+    
+    # Over Warehouse B capacity: move units to A where A costs least extra first
+    shortfall = np.maximum(lower - (ship_a1 + ship_a2), 0.0)
+    route_1_first = delta_1 <= delta_2
+    first = np.minimum(shortfall, np.where(route_1_first, demand_1 - ship_a1, demand_2 - ship_a2))
+    ship_a1 = ship_a1 + np.where(route_1_first, first, shortfall - first)
+    ship_a2 = ship_a2 + np.where(route_1_first, shortfall - first, first)
+    
+    ship_b1 = demand_1 - ship_a1
+    ship_b2 = demand_2 - ship_a2
+    optimal_cost = (cost_a_to_1 * ship_a1 + cost_a_to_2 * ship_a2
+                    + cost_b_to_1 * ship_b1 + cost_b_to_2 * ship_b2)
+    return feasible, ship_a1, ship_a2, ship_b1, ship_b2, optimal_cost
+
+
+@lru_cache(maxsize=10_000)
+def _solve_with_lp(cap_a: float, cap_b: float, demand_1: float, demand_2: float,
+                   cost_a_to_1: float, cost_a_to_2: float, cost_b_to_1: float, cost_b_to_2: float):
+    """
+    Solve a single scenario with the PuLP transportation model.
+    
+    Memoized on the scenario parameters, so repeated scenarios are solved once
+    per process (kept at module level so model instances stay picklable).
+    
+    Returns:
+        Array of (optimal_cost, shipments a1/a2/b1/b2), or None if infeasible
+    """
+    # Only the capacities and demands of the configuration are used by the LP
+    config = {
+        'warehouses': {
+            'Warehouse_A': {'capacity': int(cap_a)},
+            'Warehouse_B': {'capacity': int(cap_b)}
+        },
+        'customers': {
+            'Customer_1': {'demand': int(demand_1)},
+            'Customer_2': {'demand': int(demand_2)}
+        }
+    }
+    # Wrap a 2x2 array rather than assembling column dicts
+    costs = np.array([[cost_a_to_1, cost_a_to_2], [cost_b_to_1, cost_b_to_2]], dtype=np.float64)
+    cost_matrix = pd.DataFrame(costs, index=['Warehouse_A', 'Warehouse_B'],
+                               columns=['Customer_1', 'Customer_2'], copy=False)
+    
+    lp_model = TransportationLP.from_memory(cost_matrix, config)
+    
+    # solve() returns boolean (True if optimal, False if not)
+    if not lp_model.solve():
+        return None
+    
+    # Flat [total_cost, a1, a2, b1, b2]; utilization is computed by predict for all scenarios
+    solution = lp_model.get_solution_array()
+    # Shared between scenarios through the cache
+    solution.flags.writeable = False
+    return solution
+
+
+def _try_solve_with_lp(key: tuple) -> tuple:
+    """Run _solve_with_lp on a parameter key, returning (solution, error message)."""
+    try:
+        return _solve_with_lp(*key), None
+    except Exception as e:
+        return None, str(e)
+
+
+@lru_cache(maxsize=1)
+def _detect_udf_context() -> bool:
+    """
+    Detect if we're running in a UDF execution context (invariant per process).
+    
+    Key distinction:
+    - Local environment: Can create sessions using credentials (even if no active session)
+    - SPCS environment: Has active session available
+    - UDF environment: Cannot create sessions AND no active session
+    
+    Returns:
+        True if running as UDF, False if running locally/SPCS
+    """
+    try:
+        # Method 1: Check for explicit UDF environment indicators
+        # These are set by Snowflake specifically in UDF execution context
+        udf_indicators = [
+            'SNOWFLAKE_WAREHOUSE_ID',
+            'SNOWFLAKE_CLUSTER_ID', 
+            'SNOWFLAKE_SESSION_ID',
+            'SNOWFLAKE_QUERY_ID'
+        ]
+        
+        udf_env_vars = [var for var in udf_indicators if os.getenv(var)]
+        if udf_env_vars:
+            logger.info(f"🔍 UDF environment indicators found: {udf_env_vars} → SQL mode")
+            return True
+        
+        # Method 2: Check if we have the credentials needed to create a session
+        # (Python mode whether or not a session is active, so skip the probe)
+        required_creds = ['SNOWFLAKE_ACCOUNT', 'SNOWFLAKE_USER']
+        auth_creds = ['SNOWFLAKE_PASSWORD', 'SNOWFLAKE_PRIVATE_KEY_PATH']
+        
+        has_basic_creds = all(os.getenv(var) for var in required_creds)
+        has_auth_creds = any(os.getenv(var) for var in auth_creds)
+        
+        if has_basic_creds and has_auth_creds:
+            logger.info("🔍 Credentials available for session creation → Local environment → Python mode")
+            return False
+        
+        # Method 3: Try to get active session (works in SPCS)
+        try:
+            from snowflake.snowpark.context import get_active_session
+            session = get_active_session()
+            
+            # If we can get current database/schema, we're in SPCS or similar
+            current_db = session.get_current_database()
+            current_schema = session.get_current_schema()
+            logger.info(f"🔍 Active session detected - DB: {current_db}, Schema: {current_schema} → Python mode")
+            return False
+            
+        except ImportError:
+            # get_active_session not available - likely local environment
+            logger.info("🔍 get_active_session not available → Local environment → Python mode")
+            return False
+            
+        except Exception as session_error:
+            # No active session - need to distinguish between local and UDF
+            logger.info(f"🔍 No active session: {session_error}")
+            
+            # Method 4: No credentials either - could be UDF or misconfigured local
+            # Check for UDF-specific error patterns as additional signal
+            error_str = str(session_error).lower()
+            udf_error_indicators = [
+                'no default session is found',
+                'function execution',
+                'udf'
+            ]
+            
+            if any(indicator in error_str for indicator in udf_error_indicators):
+                logger.info(f"🔍 UDF-specific error pattern detected → SQL mode")
+                return True
+            else:
+                # Unclear situation - default to Python mode for better UX
+                logger.info(f"🔍 No credentials + unclear error → Defaulting to Python mode")
+                return False
+                
+    except Exception as e:
+        # If detection fails completely, default to Python mode
+        logger.warning(f"🔍 Context detection failed: {e} → Defaulting to Python mode")
+        return False
+
+
 class SnowflakeTransportationModel(custom_model.CustomModel):
     """
     Snowflake custom model wrapper for transportation optimization.
@@ -70,7 +278,7 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
     - execution_mode: Mode used for this prediction (python/sql)
     """
     
-    def __init__(self, context: custom_model.ModelContext, mode: str = 'auto') -> None:
+    def __init__(self, context: custom_model.ModelContext, mode: str = 'auto', parallel: bool = True) -> None:
         """
         Initialize the transportation model with mode detection.
         
@@ -80,8 +288,10 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
                   'auto': Automatically detect based on execution context
                   'python': Force feature store integration for programmatic usage
                   'sql': Force pre-joined data mode for UDF execution
+            parallel: Solve LP fallback scenarios concurrently on a thread pool
         """
         super().__init__(context)
+        self.parallel = parallel
         
         # Load base configuration
         if 'config_template_file' in self.context.artifacts:
@@ -89,8 +299,16 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
         else:
             config_file = './configs/constraints.json'
         
-        with open(config_file, 'r') as f:
-            self.base_config = json.load(f)
+        # Parsed once per file version (the same cache TransportationLP uses);
+        # private copy so instance changes never leak into it
+        mtime_ns = os.stat(config_file).st_mtime_ns
+        self.base_config = copy.deepcopy(_read_config(config_file, mtime_ns))
+        
+        # Template defaults for the per-scenario overrides, read once
+        self._default_cap_a = self.base_config['warehouses']['Warehouse_A']['capacity']
+        self._default_cap_b = self.base_config['warehouses']['Warehouse_B']['capacity']
+        self._default_demand_1 = self.base_config['customers']['Customer_1']['demand']
+        self._default_demand_2 = self.base_config['customers']['Customer_2']['demand']
         
         # Determine execution mode
         self.mode = self._determine_mode(mode)
@@ -135,84 +353,13 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
         """
         Detect if we're running in a UDF execution context.
         
-        Key distinction:
-        - Local environment: Can create sessions using credentials (even if no active session)
-        - SPCS environment: Has active session available
-        - UDF environment: Cannot create sessions AND no active session
+        The environment does not change within a process, so the detection in
+        _detect_udf_context runs once and is shared by every model instance.
         
         Returns:
             True if running as UDF, False if running locally/SPCS
         """
-        try:
-            import os
-            
-            # Method 1: Check for explicit UDF environment indicators
-            # These are set by Snowflake specifically in UDF execution context
-            udf_indicators = [
-                'SNOWFLAKE_WAREHOUSE_ID',
-                'SNOWFLAKE_CLUSTER_ID', 
-                'SNOWFLAKE_SESSION_ID',
-                'SNOWFLAKE_QUERY_ID'
-            ]
-            
-            udf_env_vars = [var for var in udf_indicators if os.getenv(var)]
-            if udf_env_vars:
-                logger.info(f"🔍 UDF environment indicators found: {udf_env_vars} → SQL mode")
-                return True
-            
-            # Method 2: Try to get active session (works in SPCS)
-            try:
-                from snowflake.snowpark.context import get_active_session
-                session = get_active_session()
-                
-                # If we can get current database/schema, we're in SPCS or similar
-                current_db = session.get_current_database()
-                current_schema = session.get_current_schema()
-                logger.info(f"🔍 Active session detected - DB: {current_db}, Schema: {current_schema} → Python mode")
-                return False
-                
-            except ImportError:
-                # get_active_session not available - likely local environment
-                logger.info("🔍 get_active_session not available → Local environment → Python mode")
-                return False
-                
-            except Exception as session_error:
-                # No active session - need to distinguish between local and UDF
-                logger.info(f"🔍 No active session: {session_error}")
-                
-                # Method 3: Try to determine if we can create a session (local vs UDF test)
-                # Check if we have the basic credentials needed to create a session
-                required_creds = ['SNOWFLAKE_ACCOUNT', 'SNOWFLAKE_USER']
-                auth_creds = ['SNOWFLAKE_PASSWORD', 'SNOWFLAKE_PRIVATE_KEY_PATH']
-                
-                has_basic_creds = all(os.getenv(var) for var in required_creds)
-                has_auth_creds = any(os.getenv(var) for var in auth_creds)
-                
-                if has_basic_creds and has_auth_creds:
-                    logger.info("🔍 Credentials available for session creation → Local environment → Python mode")
-                    return False
-                else:
-                    # No credentials available - could be UDF or misconfigured local
-                    # Check for UDF-specific error patterns as additional signal
-                    error_str = str(session_error).lower()
-                    udf_error_indicators = [
-                        'no default session is found',
-                        'function execution',
-                        'udf'
-                    ]
-                    
-                    if any(indicator in error_str for indicator in udf_error_indicators):
-                        logger.info(f"🔍 UDF-specific error pattern detected → SQL mode")
-                        return True
-                    else:
-                        # Unclear situation - default to Python mode for better UX
-                        logger.info(f"🔍 No credentials + unclear error → Defaulting to Python mode")
-                        return False
-                    
-        except Exception as e:
-            # If detection fails completely, default to Python mode
-            logger.warning(f"🔍 Context detection failed: {e} → Defaulting to Python mode")
-            return False
+        return _detect_udf_context()
     
     def _ensure_feature_store(self):
         """Ensure feature store is initialized (for Python mode only)."""
@@ -272,25 +419,44 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
             logger.error(f"Failed to initialize feature store: {e}")
             raise RuntimeError(f"Could not initialize feature store: {e}") from e
     
-    def _get_cost_matrix_from_feature_store(self, feature_timestamp: datetime = None) -> pd.DataFrame:
+    def _get_route_costs_from_feature_store(self, feature_timestamp: datetime = None) -> np.ndarray:
         """
-        Retrieve cost matrix from feature store.
+        Retrieve the feature store costs as a read-only array in _COST_ROUTES order.
+        
+        Results are cached per process for _COST_MATRIX_TTL seconds, so repeated
+        scenarios and model instances skip the Snowflake round trip.
         
         Args:
             feature_timestamp: Point-in-time timestamp for feature lookup
             
         Returns:
-            Cost matrix DataFrame
+            Array of the four route costs
         """
         if self.feature_store_manager is None:
             raise ValueError("Feature store not available - ensure _ensure_feature_store() was called first")
         
+        fs = self.feature_store_manager
+        cache_key = (fs.database, fs.schema, feature_timestamp)
+        with _COST_MATRIX_LOCK:
+            cached = _COST_MATRIX_CACHE.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                _COST_MATRIX_CACHE.move_to_end(cache_key)
+                return cached[1]
+        
         try:
-            cost_matrix = self.feature_store_manager.get_latest_cost_matrix(feature_timestamp)
-            return cost_matrix
+            # Same route order as _COST_ROUTES
+            route_costs = fs.get_latest_route_costs(feature_timestamp)
         except Exception as e:
             logger.error(f"Failed to retrieve cost matrix from feature store: {e}")
             raise
+        # Shared across scenarios and model instances
+        route_costs.flags.writeable = False
+        with _COST_MATRIX_LOCK:
+            _COST_MATRIX_CACHE[cache_key] = (time.monotonic() + _COST_MATRIX_TTL, route_costs)
+            _COST_MATRIX_CACHE.move_to_end(cache_key)
+            while len(_COST_MATRIX_CACHE) > _COST_MATRIX_CACHE_SIZE:
+                _COST_MATRIX_CACHE.popitem(last=False)
+        return route_costs
     
     @custom_model.inference_api
     def predict(self, input: pd.DataFrame) -> pd.DataFrame:
@@ -301,230 +467,267 @@ class SnowflakeTransportationModel(custom_model.CustomModel):
         - Python mode: Uses feature store integration with optional overrides
         - SQL mode: Expects all cost matrix values as pre-joined inputs
         
+        Scenarios are solved together with a vectorized closed form of the 2x2
+        transportation LP; scenarios outside its domain (negative costs, zero
+        capacities, non-finite values) fall back to the PuLP model one by one.
+        
         Args:
             input: DataFrame with scenario parameters (format depends on mode)
             
         Returns:
             DataFrame with optimization results
         """
-        results = []
+        n = len(input)
+        logger.info(f"🎯 Processing {n} scenarios in '{self.mode}' mode")
         
-        for _, row in input.iterrows():
-            scenario_name = "unknown"  # Initialize with default value
+        # Scenario metadata
+        if 'scenario_name' in input:
+            scenario_names = input['scenario_name'].to_numpy(dtype=object, copy=True)
+        else:
+            scenario_names = np.array([f'scenario_{i}' for i in range(n)], dtype=object)
+        if 'feature_timestamp' in input:
+            raw_timestamps = input['feature_timestamp'].to_numpy(dtype=object)
+        else:
+            raw_timestamps = np.full(n, None, dtype=object)
+        
+        # Per-scenario error message (None while the scenario is still valid)
+        errors = np.full(n, None, dtype=object)
+        feature_timestamps = raw_timestamps.copy()
+        # ISO strings are parsed in one vectorized pass; datetimes pass through
+        is_text = np.array([bool(value) and isinstance(value, str) for value in raw_timestamps], dtype=bool)
+        if is_text.any():
+            text_rows = np.flatnonzero(is_text)
             try:
-                # Extract scenario parameters
-                scenario_name = row.get('scenario_name', f'scenario_{len(results)}')
-                feature_timestamp = row.get('feature_timestamp', None)
-                
-                if feature_timestamp and isinstance(feature_timestamp, str):
-                    feature_timestamp = datetime.fromisoformat(feature_timestamp)
-                
-                # Create dynamic configuration based on template
-                config = json.loads(json.dumps(self.base_config))  # Deep copy
-                
-                # Override warehouse capacities if provided
-                if 'warehouse_a_capacity' in row:
-                    config['warehouses']['Warehouse_A']['capacity'] = int(row['warehouse_a_capacity'])
-                if 'warehouse_b_capacity' in row:
-                    config['warehouses']['Warehouse_B']['capacity'] = int(row['warehouse_b_capacity'])
-                
-                # Override customer demands if provided  
-                if 'customer_1_demand' in row:
-                    config['customers']['Customer_1']['demand'] = int(row['customer_1_demand'])
-                if 'customer_2_demand' in row:
-                    config['customers']['Customer_2']['demand'] = int(row['customer_2_demand'])
-                
-                # Get cost matrix based on execution mode
-                logger.info(f"🎯 Processing scenario '{scenario_name}' in '{self.mode}' mode")
-                if self.mode == 'python':
-                    logger.info("🐍 Using Python mode for cost matrix retrieval")
-                    cost_matrix, cost_matrix_source = self._get_cost_matrix_python_mode(row, feature_timestamp)
-                else:  # self.mode == 'sql'
-                    logger.info("🗄️ Using SQL mode for cost matrix retrieval")
-                    cost_matrix, cost_matrix_source = self._get_cost_matrix_sql_mode(row)
-                
-                # Create temporary files for the LP model
-                cost_data = []
-                for warehouse in cost_matrix.index:
-                    for customer in cost_matrix.columns:
-                        cost_data.append({
-                            'warehouse': warehouse,
-                            'customer': customer,
-                            'cost_per_unit': cost_matrix.loc[warehouse, customer]  # Changed from 'cost' to 'cost_per_unit'
-                        })
-                
-                # Create temporary CSV for cost data
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-                    cost_df = pd.DataFrame(cost_data)
-                    cost_df.to_csv(f.name, index=False)
-                    temp_csv = f.name
-                
-                # Create temporary JSON for configuration
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                    json.dump(config, f)
-                    temp_json = f.name
-                
+                parsed = pd.to_datetime(raw_timestamps[text_rows], format='ISO8601',
+                                        errors='coerce').to_pydatetime()
+            except ValueError:
+                # Mixed UTC offsets cannot share one index; parse those row by row
+                parsed = np.full(len(text_rows), pd.NaT, dtype=object)
+            unparsed = pd.isna(parsed)
+            feature_timestamps[text_rows[~unparsed]] = parsed[~unparsed]
+            for i in text_rows[unparsed]:
                 try:
-                    # Run the optimization
-                    from models.transportation_lp import TransportationLP
-                    lp_model = TransportationLP(
-                        data_file=temp_csv,  # data_file parameter for cost data
-                        config_file=temp_json  # config_file parameter for constraints
-                    )
-                    
-                    # solve() returns boolean (True if optimal, False if not)
-                    is_optimal = lp_model.solve()
-                    
-                    if is_optimal:
-                        # Get detailed solution summary
-                        solution = lp_model.get_solution_summary()
-                        
-                        result = {
-                            'optimal_cost': solution['total_cost'],
-                            'feasible': True,
-                            'shipment_a_to_1': solution['shipments']['Warehouse_A']['Customer_1'],
-                            'shipment_a_to_2': solution['shipments']['Warehouse_A']['Customer_2'], 
-                            'shipment_b_to_1': solution['shipments']['Warehouse_B']['Customer_1'],
-                            'shipment_b_to_2': solution['shipments']['Warehouse_B']['Customer_2'],
-                            'warehouse_a_utilization': solution['warehouse_utilization']['Warehouse_A']['utilization_rate'] * 100,
-                            'warehouse_b_utilization': solution['warehouse_utilization']['Warehouse_B']['utilization_rate'] * 100
-                        }
-                    else:
-                        # Infeasible solution
-                        result = {
-                            'optimal_cost': None,
-                            'feasible': False,
-                            'shipment_a_to_1': 0,
-                            'shipment_a_to_2': 0,
-                            'shipment_b_to_1': 0,
-                            'shipment_b_to_2': 0,
-                            'warehouse_a_utilization': 0,
-                            'warehouse_b_utilization': 0
-                        }
-                    
-                    # Add scenario metadata to result
-                    result['scenario_name'] = scenario_name
-                    result['cost_matrix_source'] = cost_matrix_source
-                    result['feature_timestamp'] = feature_timestamp
-                    result['execution_mode'] = self.mode
-                    
-                finally:
-                    # Clean up temporary files
-                    try:
-                        os.unlink(temp_csv)
-                        os.unlink(temp_json)
-                    except:
-                        pass  # Ignore cleanup errors
-                        
-                results.append(result)
-                
+                    feature_timestamps[i] = datetime.fromisoformat(raw_timestamps[i])
+                except ValueError as e:
+                    errors[i] = str(e)
+        
+        # Warehouse capacities and customer demands; absent columns use the template
+        cap_a = self._units_column(input, 'warehouse_a_capacity', self._default_cap_a, errors)
+        cap_b = self._units_column(input, 'warehouse_b_capacity', self._default_cap_b, errors)
+        demand_1 = self._units_column(input, 'customer_1_demand', self._default_demand_1, errors)
+        demand_2 = self._units_column(input, 'customer_2_demand', self._default_demand_2, errors)
+        
+        # Cost matrix per scenario as an (n, 4) array in _COST_COLUMNS order
+        if self.mode == 'python':
+            logger.info("🐍 Using Python mode for cost matrix retrieval")
+            costs, sources = self._get_costs_python_mode(input, feature_timestamps, errors)
+        else:  # self.mode == 'sql'
+            logger.info("🗄️ Using SQL mode for cost matrix retrieval")
+            costs, sources = self._get_costs_sql_mode(input, errors)
+        
+        valid = np.array([error is None for error in errors], dtype=bool)
+        with np.errstate(invalid='ignore'):
+            closed_form = (valid
+                           & np.isfinite(costs).all(axis=1) & (costs >= 0).all(axis=1)
+                           & np.isfinite(cap_a) & np.isfinite(cap_b) & (cap_a > 0) & (cap_b > 0)
+                           & np.isfinite(demand_1) & np.isfinite(demand_2)
+                           & (demand_1 >= 0) & (demand_2 >= 0))
+            feasible, ship_a1, ship_a2, ship_b1, ship_b2, optimal_cost = _solve_transportation_2x2(
+                cap_a, cap_b, demand_1, demand_2, *costs.T)
+        
+        # Column-major so each output column below is a contiguous float64 view;
+        # columns are optimal cost, shipments a1/a2/b1/b2 and utilization a/b
+        solved = np.empty((n, 7), order='F')
+        solved[:, :5] = np.column_stack([optimal_cost, ship_a1, ship_a2, ship_b1, ship_b2])
+        feasible &= closed_form
+        
+        # Scenarios the closed form does not cover go through the LP solver, unless
+        # total capacity cannot meet total demand (infeasible whatever the costs)
+        with np.errstate(invalid='ignore'):
+            short_of_capacity = ((cap_a < 0) | (cap_b < 0)
+                                 | (cap_a + cap_b < demand_1 + demand_2))
+        fallback = np.flatnonzero(valid & ~closed_form & ~short_of_capacity)
+        # Rounded so equal scenarios share a cache entry despite float noise
+        keys = [tuple(round(float(value), 6)
+                      for value in (cap_a[i], cap_b[i], demand_1[i], demand_2[i], *costs[i]))
+                for i in fallback]
+        # Solve each distinct scenario once; concurrent misses would bypass the cache
+        unique_keys = list(dict.fromkeys(keys))
+        if self.parallel and len(unique_keys) > 1:
+            # CBC runs as a subprocess, so threads solve independent scenarios concurrently
+            with ThreadPoolExecutor(max_workers=min(len(unique_keys), os.cpu_count() or 1)) as executor:
+                outcomes = dict(zip(unique_keys, executor.map(_try_solve_with_lp, unique_keys)))
+        else:
+            outcomes = {key: _try_solve_with_lp(key) for key in unique_keys}
+        
+        for i, key in zip(fallback, keys):
+            solution, error = outcomes[key]
+            if error is not None:
+                errors[i] = error
+            elif solution is not None:
+                solved[i, :5] = solution
+                feasible[i] = True
+        
+        # Utilization for every solved scenario at once (an empty warehouse counts as 0%)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            solved[:, 5] = np.divide(solved[:, 1] + solved[:, 2], cap_a,
+                                     out=np.zeros(n), where=cap_a != 0) * 100
+            solved[:, 6] = np.divide(solved[:, 3] + solved[:, 4], cap_b,
+                                     out=np.zeros(n), where=cap_b != 0) * 100
+        
+        # Infeasible and failed scenarios report no shipments
+        solved[~feasible] = 0
+        solved[~feasible, 0] = np.nan
+        
+        failed = np.array([error is not None for error in errors], dtype=bool)
+        for i in np.flatnonzero(failed):
+            if scenario_names[i] is None:
+                scenario_names[i] = f"scenario_{i}"
+            logger.error(f"Error processing scenario {scenario_names[i]}: {errors[i]}")
+        sources[failed] = "error"
+        feature_timestamps[failed] = raw_timestamps[failed]
+        
+        results = pd.DataFrame({
+            'optimal_cost': solved[:, 0],
+            'feasible': feasible,
+            'shipment_a_to_1': solved[:, 1],
+            'shipment_a_to_2': solved[:, 2],
+            'shipment_b_to_1': solved[:, 3],
+            'shipment_b_to_2': solved[:, 4],
+            'warehouse_a_utilization': solved[:, 5],
+            'warehouse_b_utilization': solved[:, 6],
+            'scenario_name': scenario_names,
+            'cost_matrix_source': sources,
+            'feature_timestamp': feature_timestamps,
+            'execution_mode': self.mode
+        }, copy=False)
+        if failed.any():
+            # NaN for scenarios that succeeded, as a column of per-row dicts would give
+            results['error'] = np.where(failed, errors, np.nan)
+        
+        return results
+    
+    @staticmethod
+    def _units_column(input: pd.DataFrame, column: str, default: int,
+                      errors: np.ndarray) -> np.ndarray:
+        """
+        Whole-unit values of an optional input column, using ``default`` only when
+        the column is absent. Empty or non-numeric values are recorded in ``errors``.
+        """
+        if column not in input:
+            return np.full(len(input), float(default))
+        values = pd.to_numeric(input[column], errors='coerce').to_numpy(dtype=float)
+        for i in np.flatnonzero(np.isnan(values)):
+            if errors[i] is None:
+                errors[i] = f"Invalid {column}: {input[column].iloc[i]!r}"
+        return np.trunc(values)
+    
+    def _get_costs_python_mode(self, input: pd.DataFrame, feature_timestamps: np.ndarray,
+                               errors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Resolve the cost matrix of every scenario in Python mode.
+        
+        Scenarios whose lookup fails get their message recorded in ``errors``.
+        
+        Returns:
+            Tuple of ((n, 4) cost array in _COST_COLUMNS order, source per scenario)
+        """
+        n = len(input)
+        costs = np.full((n, len(_COST_COLUMNS)), np.nan)
+        sources = np.full(n, "error", dtype=object)
+        # Every record has the same keys, so check for override columns once
+        override_columns = tuple(column for column in _COST_COLUMNS if column in input)
+        for i, row in enumerate(input.to_dict('records')):
+            if errors[i] is not None:
+                continue
+            try:
+                costs[i], sources[i] = self._get_route_costs_python_mode(row, feature_timestamps[i],
+                                                                         override_columns)
             except Exception as e:
-                # Ensure scenario_name is never None for logging
-                safe_scenario_name = scenario_name if scenario_name is not None else f"scenario_{len(results)}"
-                logger.error(f"Error processing scenario {safe_scenario_name}: {e}")
-                # Add error result
-                error_result = {
-                    'scenario_name': safe_scenario_name,
-                    'optimal_cost': None,
-                    'feasible': False,
-                    'shipment_a_to_1': 0,
-                    'shipment_a_to_2': 0,
-                    'shipment_b_to_1': 0,
-                    'shipment_b_to_2': 0,
-                    'warehouse_a_utilization': 0,
-                    'warehouse_b_utilization': 0,
-                    'cost_matrix_source': "error",
-                    'feature_timestamp': row.get('feature_timestamp', None),
-                    'execution_mode': self.mode,
-                    'error': str(e)
-                }
-                results.append(error_result)
-        
-        return pd.DataFrame(results)
-    
-    def _get_cost_matrix_python_mode(self, row: pd.Series, feature_timestamp: datetime = None) -> tuple[pd.DataFrame, str]:
+                errors[i] = str(e)
+        return costs, sources
+    
+    def _get_route_costs_python_mode(self, row: Dict[str, Any], feature_timestamp: datetime = None,
+                                     override_columns: tuple = None) -> tuple[np.ndarray, str]:
         """
-        Get cost matrix for Python mode with feature store integration.
+        Get the route costs for Python mode with feature store integration.
         
         Args:
             row: Input row with scenario parameters
             feature_timestamp: Optional timestamp for point-in-time lookup
+            override_columns: Cost columns present in the row (looked up if None)
             
         Returns:
-            Tuple of (cost_matrix_dataframe, source_description)
+            Tuple of (costs in _COST_COLUMNS order, source_description)
         """
+        if override_columns is None:
+            override_columns = tuple(column for column in _COST_COLUMNS if column in row)
         use_feature_store = row.get('use_feature_store', True)
-        has_cost_overrides = any(col in row for col in ['cost_a_to_1', 'cost_a_to_2', 'cost_b_to_1', 'cost_b_to_2'])
+        has_cost_overrides = bool(override_columns)
         
-        logger.info(f"🐍 Python mode cost retrieval: use_feature_store={use_feature_store}, has_cost_overrides={has_cost_overrides}")
+        # Called once per scenario, so stay quiet unless debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"🐍 Python mode cost retrieval: use_feature_store={use_feature_store}, has_cost_overrides={has_cost_overrides}")
+        
+        if use_feature_store and self.feature_store_manager is None:
+            # First use initializes it; after a failure this re-raises the stored error
+            self._ensure_feature_store()
         
         if has_cost_overrides and use_feature_store:
             # Use feature store as base with overrides
-            logger.info("🔄 Using feature store as base with cost overrides")
-            self._ensure_feature_store()
-            base_cost_matrix = self._get_cost_matrix_from_feature_store(feature_timestamp)
+            logger.debug("🔄 Using feature store as base with cost overrides")
+            route_costs = self._get_route_costs_from_feature_store(feature_timestamp).copy()
             
             # Apply overrides
-            if 'cost_a_to_1' in row:
-                base_cost_matrix.loc['Warehouse_A', 'Customer_1'] = row['cost_a_to_1']
-            if 'cost_a_to_2' in row:
-                base_cost_matrix.loc['Warehouse_A', 'Customer_2'] = row['cost_a_to_2']
-            if 'cost_b_to_1' in row:
-                base_cost_matrix.loc['Warehouse_B', 'Customer_1'] = row['cost_b_to_1']
-            if 'cost_b_to_2' in row:
-                base_cost_matrix.loc['Warehouse_B', 'Customer_2'] = row['cost_b_to_2']
+            for column in override_columns:
+                route_costs[_COST_COLUMNS.index(column)] = row[column]
             
-            return base_cost_matrix, "override"
+            return route_costs, "override"
             
         elif use_feature_store:
             # Use feature store only (no overrides)
-            logger.info("🏪 Using feature store for cost matrix")
-            self._ensure_feature_store()
-            cost_matrix = self._get_cost_matrix_from_feature_store(feature_timestamp)
-            return cost_matrix, "feature_store"
+            logger.debug("🏪 Using feature store for cost matrix")
+            return self._get_route_costs_from_feature_store(feature_timestamp), "feature_store"
             
         else:
             # Use explicit overrides only (no feature store)
-            logger.info("⚡ Using explicit cost overrides only")
+            logger.debug("⚡ Using explicit cost overrides only")
             if not has_cost_overrides:
                 raise ValueError("use_feature_store=False requires cost overrides. "
                                "Please provide cost_a_to_1, cost_a_to_2, cost_b_to_1, cost_b_to_2")
             
-            cost_matrix = pd.DataFrame({
-                'Customer_1': [row.get('cost_a_to_1', 10), row.get('cost_b_to_1', 15)],
-                'Customer_2': [row.get('cost_a_to_2', 12), row.get('cost_b_to_2', 8)]
-            }, index=['Warehouse_A', 'Warehouse_B'])
-            
-            return cost_matrix, "override_only"
+            route_costs = np.array([row.get(column, default)
+                                    for column, default in zip(_COST_COLUMNS, _OVERRIDE_ONLY_DEFAULT_COSTS)],
+                                   dtype=np.float64)
+            return route_costs, "override_only"
     
-    def _get_cost_matrix_sql_mode(self, row: pd.Series) -> tuple[pd.DataFrame, str]:
+    def _get_costs_sql_mode(self, input: pd.DataFrame, errors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
         """
-        Get cost matrix for SQL mode expecting pre-joined data.
+        Read the pre-joined cost matrix of every scenario in SQL mode.
+        
+        Scenarios missing any cost get their message recorded in ``errors``.
         
-        Args:
-            row: Input row with pre-joined cost matrix values
-            
         Returns:
-            Tuple of (cost_matrix_dataframe, source_description)
+            Tuple of ((n, 4) cost array in _COST_COLUMNS order, source per scenario)
         """
         # Extract cost matrix from input (required in SQL mode)
-        required_costs = ['cost_a_to_1', 'cost_a_to_2', 'cost_b_to_1', 'cost_b_to_2']
-        missing_costs = [cost for cost in required_costs if cost not in row or pd.isna(row[cost])]
-        
-        if missing_costs:
-            raise ValueError(f"SQL mode requires all cost parameters. Missing: {missing_costs}. "
-                           f"Please join feature store views in SQL before calling the model.")
+        n = len(input)
+        costs = np.full((n, len(_COST_COLUMNS)), np.nan)
+        for j, column in enumerate(_COST_COLUMNS):
+            if column in input:
+                costs[:, j] = pd.to_numeric(input[column], errors='coerce')
         
-        # Create cost matrix from input parameters
-        cost_matrix = pd.DataFrame({
-            'Customer_1': [float(row['cost_a_to_1']), float(row['cost_b_to_1'])],
-            'Customer_2': [float(row['cost_a_to_2']), float(row['cost_b_to_2'])]
-        }, index=['Warehouse_A', 'Warehouse_B'])
+        missing = np.isnan(costs)
+        for i in np.flatnonzero(missing.any(axis=1)):
+            if errors[i] is None:
+                missing_costs = [column for column, is_missing in zip(_COST_COLUMNS, missing[i]) if is_missing]
+                errors[i] = (f"SQL mode requires all cost parameters. Missing: {missing_costs}. "
+                             f"Please join feature store views in SQL before calling the model.")
         
-        return cost_matrix, "sql_input"
+        return costs, np.full(n, "sql_input", dtype=object)
 
 
-def create_snowflake_model(config_template_file: str = None, mode: str = 'auto'):
+def create_snowflake_model(config_template_file: str = None, mode: str = 'auto', parallel: bool = True):
     """
     Create and return a Snowflake-compatible transportation model.
     
@@ -534,6 +737,7 @@ def create_snowflake_model(config_template_file: str = None, mode: str = 'auto')
               'auto': Automatically detect based on execution context (default)
               'python': Force feature store integration for programmatic usage
               'sql': Force pre-joined data mode for UDF execution
+        parallel: Solve LP fallback scenarios concurrently (default: True)
     
     Returns:
         SnowflakeTransportationModel: Configured model instance
@@ -553,4 +757,4 @@ def create_snowflake_model(config_template_file: str = None, mode: str = 'auto')
     if config_template_file:
         context.artifacts['config_template_file'] = config_template_file
     
-    return SnowflakeTransportationModel(context, mode=mode)
+    return SnowflakeTransportationModel(context, mode=mode, parallel=parallel)
@@ -15,10 +15,36 @@ Problem Structure:
   * Customer demand requirements
 """
 
+import copy
+import os
+import numpy as np
 import pandas as pd
 import json
+import logging
+from functools import lru_cache
 from pulp import *
 
+# Quiet copy of PuLP's default solver (the bundled CBC); the model logs its own report
+_SOLVER = LpSolverDefault
+if _SOLVER is not None:
+    _SOLVER = _SOLVER.copy()
+    _SOLVER.msg = False
+
+# CBC exchanges the model and solution with PuLP through temp files; write them
+# to tmpfs when it is available so each solve stays off the disk
+_TMPFS_DIR = "/dev/shm"
+if _SOLVER is not None and os.path.isdir(_TMPFS_DIR) and os.access(_TMPFS_DIR, os.W_OK):
+    _SOLVER.tmpDir = _TMPFS_DIR
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=8)
+def _read_config(config_file, mtime_ns):
+    """Parse a constraint file; mtime_ns is part of the key so edits are picked up"""
+    with open(config_file, 'r') as f:
+        return json.load(f)
+
 
 class TransportationLP:
     def __init__(self, data_file, config_file):
@@ -33,9 +59,32 @@ class TransportationLP:
         self.config_file = config_file
         self.model = None
         self.variables = {}
+        self.shipments = None
         self.load_data()
         self.load_config()
     
+    @classmethod
+    def from_memory(cls, cost_matrix, config):
+        """
+        Create the model from in-memory data instead of CSV/JSON files
+        
+        Args:
+            cost_matrix (pd.DataFrame): Cost per unit with warehouses as rows, customers as columns
+            config (dict): Constraints in the same layout as the JSON config file
+        """
+        lp_model = cls.__new__(cls)
+        lp_model.data_file = None
+        lp_model.config_file = None
+        lp_model.model = None
+        lp_model.variables = {}
+        lp_model.shipments = None
+        lp_model.cost_data = None
+        lp_model.cost_matrix = cost_matrix
+        lp_model.config = config
+        lp_model._log_cost_matrix()
+        lp_model._log_config()
+        return lp_model
+    
     def load_data(self):
         """Load transportation cost data from CSV"""
         self.cost_data = pd.read_csv(self.data_file)
@@ -45,31 +94,41 @@ class TransportationLP:
             columns='customer', 
             values='cost_per_unit'
         )
-        print("Transportation Cost Matrix:")
-        print(self.cost_matrix)
-        print()
+        self._log_cost_matrix()
+    
+    def _log_cost_matrix(self):
+        # Rendering the frame is the expensive part, so skip it when nobody listens
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Transportation Cost Matrix:\n%s", self.cost_matrix)
     
     def load_config(self):
         """Load constraint configuration from JSON"""
-        with open(self.config_file, 'r') as f:
-            self.config = json.load(f)
-        
-        print("Constraint Configuration:")
-        print(f"Warehouse Capacities: {self.config['warehouses']}")
-        print(f"Customer Demands: {self.config['customers']}")
-        print()
+        # Parsed once per file version; each instance gets its own copy
+        mtime_ns = os.stat(self.config_file).st_mtime_ns
+        self.config = copy.deepcopy(_read_config(self.config_file, mtime_ns))
+        self._log_config()
+    
+    def _log_config(self):
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Constraint Configuration:\n"
+                        "Warehouse Capacities: %s\n"
+                        "Customer Demands: %s",
+                        self.config['warehouses'], self.config['customers'])
     
     def create_model(self):
         """Create the linear programming model"""
         # Initialize the model
         self.model = LpProblem("Transportation_Optimization", LpMinimize)
         
-        # Get warehouses and customers
-        warehouses = list(self.cost_matrix.index)
-        customers = list(self.cost_matrix.columns)
+        # Get warehouses and customers, leaving out those that cannot ship anything
+        costs = self.cost_matrix.to_numpy()
+        warehouse_rows, customer_cols = self._presolve_routes(costs)
+        warehouses = [self.cost_matrix.index[i] for i in warehouse_rows]
+        customers = [self.cost_matrix.columns[j] for j in customer_cols]
         
         # Create decision variables
         # x[i][j] = units shipped from warehouse i to customer j
+        # (pruned routes get no variable and report zero shipments)
         self.variables = {}
         for warehouse in warehouses:
             self.variables[warehouse] = {}
@@ -82,85 +141,127 @@ class TransportationLP:
                 )
         
         # Objective function: Minimize total transportation cost
-        objective = 0
-        for warehouse in warehouses:
-            for customer in customers:
-                cost = self.cost_matrix.loc[warehouse, customer]
-                objective += cost * self.variables[warehouse][customer]
+        # (built from (variable, coefficient) pairs in one go, not by repeated +=)
+        objective = LpAffineExpression([
+            (self.variables[warehouse][customer], costs[i, j])
+            for i, warehouse in zip(warehouse_rows, warehouses)
+            for j, customer in zip(customer_cols, customers)
+        ])
         
         self.model += objective, "Total_Transportation_Cost"
         
         # Constraint 1: Warehouse capacity constraints
-        print("Adding Constraint 1: Warehouse Capacity Limits")
+        logger.info("Adding Constraint 1: Warehouse Capacity Limits")
         for warehouse in warehouses:
             capacity = self.config['warehouses'][warehouse]['capacity']
-            constraint = 0
-            for customer in customers:
-                constraint += self.variables[warehouse][customer]
+            constraint = LpAffineExpression([(self.variables[warehouse][customer], 1) for customer in customers])
             
-            self.model += constraint <= capacity, f"Capacity_{warehouse}"
-            print(f"  {warehouse}: Total shipments <= {capacity}")
-        
-        print()
+            self.model += LpConstraint(constraint, sense=LpConstraintLE, name=f"Capacity_{warehouse}", rhs=capacity)
+            logger.debug("  %s: Total shipments <= %s", warehouse, capacity)
         
         # Constraint 2: Customer demand constraints  
-        print("Adding Constraint 2: Customer Demand Requirements")
+        logger.info("Adding Constraint 2: Customer Demand Requirements")
         for customer in customers:
             demand = self.config['customers'][customer]['demand']
-            constraint = 0
-            for warehouse in warehouses:
-                constraint += self.variables[warehouse][customer]
+            constraint = LpAffineExpression([(self.variables[warehouse][customer], 1) for warehouse in warehouses])
             
-            self.model += constraint >= demand, f"Demand_{customer}"
-            print(f"  {customer}: Total deliveries >= {demand}")
+            self.model += LpConstraint(constraint, sense=LpConstraintGE, name=f"Demand_{customer}", rhs=demand)
+            logger.debug("  %s: Total deliveries >= %s", customer, demand)
+    
+    def _presolve_routes(self, costs):
+        """
+        Return the warehouse rows and customer columns worth modelling
+        
+        A warehouse with zero capacity can only ship zero units, and a customer
+        with no positive demand receives nothing at an optimum when none of its
+        routes has a negative cost. Both are dropped unless that would leave no
+        warehouses or no customers, so the LP always has at least one variable.
+        """
+        warehouse_rows = [i for i, warehouse in enumerate(self.cost_matrix.index)
+                          if self.config['warehouses'][warehouse]['capacity'] != 0]
+        if not warehouse_rows:
+            warehouse_rows = list(range(len(self.cost_matrix.index)))
         
-        print()
+        customer_cols = [j for j, customer in enumerate(self.cost_matrix.columns)
+                         if self.config['customers'][customer]['demand'] > 0
+                         or not (costs[warehouse_rows, j] >= 0).all()]
+        if not customer_cols:
+            customer_cols = list(range(len(self.cost_matrix.columns)))
+        
+        return warehouse_rows, customer_cols
     
     def solve(self):
         """Solve the linear programming model"""
         if self.model is None:
             self.create_model()
         
-        print("Solving the Transportation LP Model...")
-        print("=" * 50)
+        logger.info("Solving the Transportation LP Model...")
         
         # Solve the model
-        self.model.solve()
+        self.shipments = None
+        self.model.solve(_SOLVER)
+        
+        # Report results in one record, built only when it will be emitted
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n".join(self._solution_report()))
         
-        # Display results
-        print(f"Status: {LpStatus[self.model.status]}")
-        print(f"Optimal Total Cost: ${value(self.model.objective):.2f}")
-        print()
+        return self.model.status == LpStatusOptimal
+    
+    def _solution_report(self):
+        """Lines of the human-readable status and shipment report"""
+        report = [
+            f"Status: {LpStatus[self.model.status]}",
+            f"Optimal Total Cost: ${value(self.model.objective):.2f}",
+            "",
+        ]
         
         if self.model.status == LpStatusOptimal:
-            print("Optimal Shipment Plan:")
-            print("-" * 30)
+            report += ["Optimal Shipment Plan:", "-" * 30]
             
             warehouses = list(self.cost_matrix.index)
             customers = list(self.cost_matrix.columns)
+            shipments = self._shipment_matrix()
+            costs = self.cost_matrix.to_numpy()
             
-            for warehouse in warehouses:
-                print(f"\n{warehouse}:")
-                warehouse_total = 0
-                for customer in customers:
-                    quantity = self.variables[warehouse][customer].varValue
+            for i, warehouse in enumerate(warehouses):
+                report.append(f"\n{warehouse}:")
+                for j, customer in enumerate(customers):
+                    quantity = shipments[i, j]
                     if quantity > 0:
-                        cost = self.cost_matrix.loc[warehouse, customer]
+                        cost = costs[i, j]
                         total_cost = quantity * cost
-                        print(f"  → {customer}: {quantity:.1f} units @ ${cost}/unit = ${total_cost:.2f}")
-                        warehouse_total += quantity
-                print(f"  Total from {warehouse}: {warehouse_total:.1f} units")
+                        report.append(f"  → {customer}: {quantity:.1f} units @ ${cost}/unit = ${total_cost:.2f}")
+                report.append(f"  Total from {warehouse}: {shipments[i].sum():.1f} units")
             
-            print("\nCustomer Fulfillment:")
-            print("-" * 20)
-            for customer in customers:
-                customer_total = 0
-                for warehouse in warehouses:
-                    customer_total += self.variables[warehouse][customer].varValue
+            report += ["\nCustomer Fulfillment:", "-" * 20]
+            for j, customer in enumerate(customers):
                 demand = self.config['customers'][customer]['demand']
-                print(f"{customer}: {customer_total:.1f} units received (demand: {demand})")
+                report.append(f"{customer}: {shipments[:, j].sum():.1f} units received (demand: {demand})")
         
-        return self.model.status == LpStatusOptimal
+        return report
+    
+    def get_solution_array(self):
+        """
+        Return the solution as a flat array, or None if not optimal
+        
+        Layout is [total_cost, shipments...] with shipments in row-major order of
+        the cost matrix (warehouse by warehouse, customers in column order)
+        """
+        if self.model is None or self.model.status != LpStatusOptimal:
+            return None
+        
+        return np.concatenate(([value(self.model.objective)], self._shipment_matrix().ravel()))
+    
+    def _shipment_matrix(self):
+        """Solved shipment quantities as a warehouses x customers array, read once per solve"""
+        if self.shipments is None:
+            self.shipments = np.zeros(self.cost_matrix.shape, dtype=np.float64)
+            for i, warehouse in enumerate(self.cost_matrix.index):
+                for j, customer in enumerate(self.cost_matrix.columns):
+                    variable = self.variables.get(warehouse, {}).get(customer)
+                    if variable is not None:
+                        self.shipments[i, j] = variable.varValue or 0.0
+        return self.shipments
     
     def get_solution_summary(self):
         """Return a summary of the solution"""
@@ -176,15 +277,15 @@ class TransportationLP:
         
         warehouses = list(self.cost_matrix.index)
         customers = list(self.cost_matrix.columns)
+        shipments = self._shipment_matrix()
+        # Plain floats, so the rates below keep Python division semantics
+        warehouse_totals = shipments.sum(axis=1).tolist()
+        customer_totals = shipments.sum(axis=0).tolist()
         
         # Get shipment details
-        for warehouse in warehouses:
-            summary['shipments'][warehouse] = {}
-            warehouse_total = 0
-            for customer in customers:
-                quantity = self.variables[warehouse][customer].varValue
-                summary['shipments'][warehouse][customer] = quantity
-                warehouse_total += quantity
+        for i, warehouse in enumerate(warehouses):
+            summary['shipments'][warehouse] = dict(zip(customers, shipments[i].tolist()))
+            warehouse_total = warehouse_totals[i]
             
             capacity = self.config['warehouses'][warehouse]['capacity']
             summary['warehouse_utilization'][warehouse] = {
@@ -194,10 +295,8 @@ class TransportationLP:
             }
         
         # Get customer satisfaction
-        for customer in customers:
-            customer_total = 0
-            for warehouse in warehouses:
-                customer_total += self.variables[warehouse][customer].varValue
+        for j, customer in enumerate(customers):
+            customer_total = customer_totals[j]
             
             demand = self.config['customers'][customer]['demand']
             summary['customer_satisfaction'][customer] = {
@@ -47,7 +47,7 @@ SELECT
     seasonal_factor,
     -- Composite cost calculation
     ((distance_km * base_rate_per_km * road_condition_factor + 
-      (distance_km / (8 * (vehicle_capacity_tons / 10) * (1 / road_condition_factor))) * fuel_price_per_liter +
+      distance_km * road_condition_factor * fuel_price_per_liter * 1.25 / vehicle_capacity_tons +
       travel_time_hours * 25 * 0.3) * 
      (10 / vehicle_capacity_tons) * seasonal_factor * priority_multiplier) as calculated_cost,
     last_updated
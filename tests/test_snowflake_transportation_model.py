@@ -0,0 +1,127 @@
+"""
+Tests for the closed-form 2x2 solver and the LP fallback in predict.
+
+The closed form is checked against TransportationLP.solve() on the same
+scenarios. Models run in SQL mode, so no feature store is needed.
+"""
+
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models.snowflake_transportation_model import (
+    _COST_COLUMNS,
+    _solve_transportation_2x2,
+    create_snowflake_model,
+)
+from models.transportation_lp import TransportationLP
+
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'configs', 'constraints.json')
+
+
+def _solve_lp(cap_a, cap_b, demand_1, demand_2, *costs):
+    """Reference solution as (feasible, optimal cost) from the PuLP model."""
+    cost_matrix = pd.DataFrame(np.reshape(np.asarray(costs, dtype=np.float64), (2, 2)),
+                               index=['Warehouse_A', 'Warehouse_B'],
+                               columns=['Customer_1', 'Customer_2'])
+    config = {
+        'warehouses': {'Warehouse_A': {'capacity': cap_a}, 'Warehouse_B': {'capacity': cap_b}},
+        'customers': {'Customer_1': {'demand': demand_1}, 'Customer_2': {'demand': demand_2}},
+    }
+    lp_model = TransportationLP.from_memory(cost_matrix, config)
+    if not lp_model.solve():
+        return False, None
+    return True, lp_model.get_solution_array()[0]
+
+
+def _solve_closed_form(*scenario):
+    return [value[0] for value in _solve_transportation_2x2(*(np.array([float(v)]) for v in scenario))]
+
+
+class ClosedFormTest(unittest.TestCase):
+
+    def assertMatchesLP(self, *scenario):
+        feasible, ship_a1, ship_a2, ship_b1, ship_b2, cost = _solve_closed_form(*scenario)
+        lp_feasible, lp_cost = _solve_lp(*scenario)
+        self.assertEqual(bool(feasible), lp_feasible)
+        if not lp_feasible:
+            return
+        self.assertAlmostEqual(cost, lp_cost, places=6)
+        cap_a, cap_b, demand_1, demand_2 = scenario[:4]
+        shipments = np.array([ship_a1, ship_a2, ship_b1, ship_b2])
+        self.assertTrue((shipments >= -1e-9).all())
+        self.assertLessEqual(ship_a1 + ship_a2, cap_a + 1e-9)
+        self.assertLessEqual(ship_b1 + ship_b2, cap_b + 1e-9)
+        self.assertAlmostEqual(ship_a1 + ship_b1, demand_1)
+        self.assertAlmostEqual(ship_a2 + ship_b2, demand_2)
+
+    def test_feasible(self):
+        self.assertMatchesLP(100, 80, 70, 60, 10, 12, 15, 8)
+        self.assertMatchesLP(60, 80, 70, 60, 10, 12, 15, 8)  # Warehouse A binds
+        self.assertMatchesLP(100, 40, 70, 60, 10, 12, 15, 8)  # Warehouse B binds
+
+    def test_infeasible(self):
+        self.assertMatchesLP(50, 30, 70, 60, 10, 12, 15, 8)
+
+    def test_ties(self):
+        # Several optimal plans; any of them is fine as long as the cost matches
+        self.assertMatchesLP(100, 80, 70, 60, 5, 5, 5, 5)
+        self.assertMatchesLP(60, 80, 70, 60, 10, 12, 10, 12)
+        self.assertMatchesLP(70, 70, 70, 60, 3, 7, 6, 10)
+
+    def test_zero_capacity_and_demand(self):
+        self.assertMatchesLP(0, 200, 70, 60, 10, 12, 15, 8)
+        self.assertMatchesLP(0, 100, 70, 60, 10, 12, 15, 8)
+        self.assertMatchesLP(100, 80, 0, 60, 10, 12, 15, 8)
+        self.assertMatchesLP(100, 80, 0, 0, 10, 12, 15, 8)
+
+    def test_random_scenarios(self):
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            scenario = (*rng.integers(0, 120, 2), *rng.integers(0, 100, 2), *rng.integers(0, 8, 4))
+            with self.subTest(scenario=scenario):
+                self.assertMatchesLP(*(int(value) for value in scenario))
+
+
+class PredictTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = create_snowflake_model(CONFIG_FILE, mode='sql', parallel=False)
+
+    def _predict(self, **columns):
+        costs = dict(zip(_COST_COLUMNS, (10.0, 12.0, 15.0, 8.0)))
+        return self.model.predict(pd.DataFrame({**costs, **columns}))
+
+    def test_zero_capacity_goes_through_lp(self):
+        results = self._predict(scenario_name=['a_closed', 'b_only'],
+                                warehouse_a_capacity=[100, 0], warehouse_b_capacity=[80, 200],
+                                customer_1_demand=[70, 70], customer_2_demand=[60, 60])
+        self.assertTrue(results['feasible'].all())
+        np.testing.assert_allclose(results['optimal_cost'],
+                                   [_solve_lp(100, 80, 70, 60, 10, 12, 15, 8)[1],
+                                    _solve_lp(0, 200, 70, 60, 10, 12, 15, 8)[1]])
+        self.assertEqual(results.loc[1, 'shipment_a_to_1'] + results.loc[1, 'shipment_a_to_2'], 0)
+        self.assertEqual(results.loc[1, 'warehouse_a_utilization'], 0)
+
+    def test_infeasible_scenario_reports_no_shipments(self):
+        results = self._predict(scenario_name=['impossible'], warehouse_a_capacity=[50],
+                                warehouse_b_capacity=[30], customer_1_demand=[70],
+                                customer_2_demand=[60])
+        self.assertFalse(results.loc[0, 'feasible'])
+        self.assertTrue(np.isnan(results.loc[0, 'optimal_cost']))
+        self.assertEqual(results.loc[0, 'shipment_a_to_1'], 0)
+        self.assertNotIn('error', results)
+
+    def test_error_column_is_nan_for_successful_rows(self):
+        results = self._predict(scenario_name=['ok', 'bad'], warehouse_a_capacity=[100, 'abc'])
+        self.assertTrue(pd.isna(results.loc[0, 'error']))
+        self.assertIsInstance(results.loc[0, 'error'], float)
+        self.assertEqual(results.loc[1, 'error'], "Invalid warehouse_a_capacity: 'abc'")
+        self.assertEqual(results.loc[1, 'cost_matrix_source'], 'error')
+
+
+if __name__ == '__main__':
+    unittest.main()
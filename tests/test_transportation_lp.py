@@ -0,0 +1,76 @@
+"""
+Tests for the route presolve in TransportationLP.
+
+Each pruned model is checked against the same model built with every route,
+so these need PuLP's bundled CBC solver but no Snowflake connection.
+"""
+
+import itertools
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from models.transportation_lp import TransportationLP
+
+WAREHOUSES = ['Warehouse_A', 'Warehouse_B']
+CUSTOMERS = ['Customer_1', 'Customer_2']
+
+
+def _build(costs, capacities, demands):
+    cost_matrix = pd.DataFrame(np.asarray(costs, dtype=np.float64), index=WAREHOUSES, columns=CUSTOMERS)
+    config = {
+        'warehouses': {w: {'capacity': c} for w, c in zip(WAREHOUSES, capacities)},
+        'customers': {c: {'demand': d} for c, d in zip(CUSTOMERS, demands)},
+    }
+    return TransportationLP.from_memory(cost_matrix, config)
+
+
+def _all_routes(self, costs):
+    return list(range(costs.shape[0])), list(range(costs.shape[1]))
+
+
+class PresolveRoutesTest(unittest.TestCase):
+
+    def test_zero_capacity_warehouse_is_pruned(self):
+        lp_model = _build([[10, 12], [15, 8]], [0, 200], [70, 60])
+        self.assertTrue(lp_model.solve())
+        self.assertNotIn('Warehouse_A', lp_model.variables)
+        np.testing.assert_allclose(lp_model.get_solution_array(), [70 * 15 + 60 * 8, 0, 0, 70, 60])
+
+    def test_zero_demand_customer_is_pruned_unless_a_route_pays(self):
+        lp_model = _build([[10, 12], [15, 8]], [100, 80], [70, 0])
+        lp_model.create_model()
+        self.assertEqual(list(lp_model.variables['Warehouse_A']), ['Customer_1'])
+
+        # A negative cost makes shipping to the customer worthwhile despite zero demand
+        lp_model = _build([[10, -3], [15, 8]], [100, 80], [70, 0])
+        lp_model.create_model()
+        self.assertEqual(list(lp_model.variables['Warehouse_A']), CUSTOMERS)
+
+    def test_all_zero_capacities_keep_every_warehouse(self):
+        lp_model = _build([[10, 12], [15, 8]], [0, 0], [0, 0])
+        self.assertTrue(lp_model.solve())
+        self.assertEqual(list(lp_model.variables), WAREHOUSES)
+        np.testing.assert_allclose(lp_model.get_solution_array(), np.zeros(5))
+
+    def test_pruned_model_matches_full_model(self):
+        capacities = [0, 30, 100]
+        demands = [0, 20, 50]
+        cost_sets = [[[10, 12], [15, 8]], [[0, 3], [7, 0]], [[-4, 3], [7, 12]]]
+        for cap_a, cap_b, demand_1, demand_2, costs in itertools.product(
+                capacities, capacities, demands, demands, cost_sets):
+            with self.subTest(capacities=(cap_a, cap_b), demands=(demand_1, demand_2), costs=costs):
+                pruned = _build(costs, [cap_a, cap_b], [demand_1, demand_2])
+                with mock.patch.object(TransportationLP, '_presolve_routes', _all_routes):
+                    full = _build(costs, [cap_a, cap_b], [demand_1, demand_2])
+                    full_ok = full.solve()
+                self.assertEqual(pruned.solve(), full_ok)
+                if full_ok:
+                    self.assertAlmostEqual(pruned.get_solution_array()[0],
+                                           full.get_solution_array()[0], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()